@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import Optional
 import os
 
@@ -15,6 +16,7 @@ class Settings(BaseSettings):
 
     # App Settings
     DEBUG: bool = True
+    SQL_ECHO: bool = False
     AUTO_REFRESH_INTERVAL: int = 30
     PRICE_CACHE_TTL: int = 60
 
@@ -26,4 +28,9 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get cached application settings (parsed once per process)"""
+    return Settings()
+
+settings = get_settings()
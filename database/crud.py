@@ -1,13 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 from database.models import Account, Holding, PriceCache
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 class AccountCRUD:
     """CRUD operations for accounts"""
 
     @staticmethod
-    def create_wallet(session: Session, name: str, blockchain: str, address: str) -> Account:
+    def create_wallet(session: Session, name: str, blockchain: str, address: str, commit: bool = True) -> Account:
         """Create a new wallet account"""
         account = Account(
             name=name,
@@ -16,12 +18,15 @@ class AccountCRUD:
             wallet_address=address
         )
         session.add(account)
-        session.commit()
-        session.refresh(account)
+        if commit:
+            session.commit()
+            session.refresh(account)
+        else:
+            session.flush()  # Assign the id; the caller commits
         return account
 
     @staticmethod
-    def create_exchange(session: Session, name: str, exchange_name: str) -> Account:
+    def create_exchange(session: Session, name: str, exchange_name: str, commit: bool = True) -> Account:
         """Create a new exchange account (no credentials stored)"""
         account = Account(
             name=name,
@@ -29,15 +34,38 @@ class AccountCRUD:
             exchange_name=exchange_name
         )
         session.add(account)
-        session.commit()
-        session.refresh(account)
+        if commit:
+            session.commit()
+            session.refresh(account)
+        else:
+            session.flush()  # Assign the id; the caller commits
         return account
 
+    @staticmethod
+    def mark_updated(session: Session, account_ids: List[int], commit: bool = True):
+        """Set last_updated to now for several accounts in a single UPDATE"""
+        if account_ids:
+            session.query(Account).filter(Account.id.in_(account_ids)).update(
+                {Account.last_updated: datetime.now()}, synchronize_session=False
+            )
+        if commit:
+            session.commit()
+
     @staticmethod
     def get_all_accounts(session: Session) -> List[Account]:
         """Get all active accounts"""
         return session.query(Account).filter(Account.is_active == True).all()
 
+    @staticmethod
+    def get_all_accounts_with_holdings(session: Session) -> List[Account]:
+        """Get all active accounts with their holdings eagerly loaded"""
+        return (
+            session.query(Account)
+            .options(selectinload(Account.holdings))
+            .filter(Account.is_active == True)
+            .all()
+        )
+
     @staticmethod
     def get_account_by_id(session: Session, account_id: int) -> Optional[Account]:
         """Get account by ID"""
@@ -51,28 +79,103 @@ class AccountCRUD:
             account.is_active = False
             session.commit()
 
+    @staticmethod
+    def delete_all_accounts(session: Session):
+        """Soft delete all active accounts in a single UPDATE"""
+        session.query(Account).filter(Account.is_active == True).update(
+            {Account.is_active: False}, synchronize_session=False
+        )
+        session.commit()
+
 class HoldingCRUD:
     """CRUD operations for holdings"""
 
     @staticmethod
-    def update_holdings(session: Session, account_id: int, holdings: List[dict]):
-        """Update holdings for an account"""
-        # Delete existing holdings
-        session.query(Holding).filter(Holding.account_id == account_id).delete()
-
-        # Add new holdings
+    def update_holdings(session: Session, account_id: int, holdings: List[dict], commit: bool = True):
+        """Update holdings for an account (upsert by symbol)"""
+        # One row per symbol; tokens sharing a symbol are merged into a single balance
+        merged = {}
         for holding_data in holdings:
-            holding = Holding(
-                account_id=account_id,
-                symbol=holding_data['symbol'],
-                balance=holding_data['balance'],
-                token_address=holding_data.get('token_address')
-            )
-            session.add(holding)
+            row = merged.get(holding_data['symbol'])
+            if row is None:
+                merged[holding_data['symbol']] = {
+                    'account_id': account_id,
+                    'symbol': holding_data['symbol'],
+                    'balance': holding_data['balance'],
+                    'token_address': holding_data.get('token_address'),
+                    'last_updated': datetime.now()
+                }
+            else:
+                row['balance'] += holding_data['balance']
+        rows = list(merged.values())
 
-        session.commit()
+        # Remove holdings that are no longer present
+        session.query(Holding).filter(
+            Holding.account_id == account_id,
+            Holding.symbol.notin_([row['symbol'] for row in rows])
+        ).delete(synchronize_session=False)
+
+        if rows:
+            dialect = session.get_bind().dialect.name
+            if dialect in ('sqlite', 'postgresql'):
+                insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+                stmt = insert(Holding).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['account_id', 'symbol'],
+                    set_={
+                        'balance': stmt.excluded.balance,
+                        'token_address': stmt.excluded.token_address,
+                        'last_updated': stmt.excluded.last_updated
+                    }
+                )
+                session.execute(stmt)
+            else:
+                # No portable upsert: replace the account's holdings
+                session.query(Holding).filter(Holding.account_id == account_id).delete(synchronize_session=False)
+                session.bulk_insert_mappings(Holding, rows)
+
+        if commit:
+            session.commit()
 
     @staticmethod
     def get_account_holdings(session: Session, account_id: int) -> List[Holding]:
         """Get all holdings for an account"""
         return session.query(Holding).filter(Holding.account_id == account_id).all()
+
+class PriceCRUD:
+    """CRUD operations for cached prices"""
+
+    @staticmethod
+    def get_fresh_prices(session: Session, symbols: List[str], currency: str, ttl_seconds: int) -> Dict[str, float]:
+        """Get cached prices for symbols that are younger than ttl_seconds"""
+        cutoff = datetime.now() - timedelta(seconds=ttl_seconds)
+        rows = (
+            session.query(PriceCache)
+            .filter(
+                PriceCache.symbol.in_(symbols),
+                PriceCache.currency == currency,
+                PriceCache.cached_at >= cutoff
+            )
+            .order_by(PriceCache.cached_at)
+            .all()
+        )
+        # Newest entry wins
+        return {row.symbol: row.price for row in rows}
+
+    @staticmethod
+    def upsert_prices(session: Session, prices: Dict[str, float], currency: str):
+        """Store the latest prices, replacing older entries for the same symbols"""
+        if not prices:
+            return
+
+        session.query(PriceCache).filter(
+            PriceCache.symbol.in_(list(prices)),
+            PriceCache.currency == currency
+        ).delete(synchronize_session=False)
+
+        now = datetime.now()
+        session.bulk_insert_mappings(PriceCache, [
+            {'symbol': symbol, 'currency': currency, 'price': price, 'cached_at': now}
+            for symbol, price in prices.items()
+        ])
+        session.commit()
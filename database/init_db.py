@@ -1,13 +1,23 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select, update, delete, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
-from database.models import Base
-from config.settings import settings
+from sqlalchemy.pool import StaticPool
+from database.models import Base, Holding
+from config.settings import get_settings
+from functools import lru_cache
 import os
 
 def init_database(db_url: str = None):
-    """Initialize database and create tables"""
+    """Initialize database and create tables (once per database URL)"""
     if db_url is None:
-        db_url = settings.DATABASE_URL
+        db_url = get_settings().DATABASE_URL
+
+    return _create_session_factory(db_url)
+
+@lru_cache(maxsize=None)
+def _create_session_factory(db_url: str):
+    """Create engine, tables and session maker for a database URL"""
+    settings = get_settings()
 
     # Create data directory if using SQLite
     if db_url.startswith('sqlite:'):
@@ -16,16 +26,67 @@ def init_database(db_url: str = None):
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
 
-    # Create engine
-    engine = create_engine(db_url, echo=settings.DEBUG)
+    # Create engine (compiled statements are cached and connections pooled)
+    engine_kwargs = {
+        'echo': settings.SQL_ECHO,
+        'query_cache_size': 1200,
+        'pool_pre_ping': True,
+    }
+    if db_url.startswith('sqlite:'):
+        engine_kwargs['connect_args'] = {'check_same_thread': False}
+
+    if db_url in ('sqlite://', 'sqlite:///:memory:'):
+        # In-memory SQLite must share a single connection
+        engine_kwargs['poolclass'] = StaticPool
+    else:
+        engine_kwargs.update(pool_size=10, max_overflow=20, pool_timeout=30)
+
+    engine = create_engine(db_url, **engine_kwargs)
+
+    if db_url.startswith('sqlite:'):
+        # WAL + relaxed fsync: commits no longer fsync twice
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA cache_size=-20000")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.close()
 
     # Create all tables
     Base.metadata.create_all(engine)
 
+    # Add indexes introduced after a table was first created
+    try:
+        with engine.begin() as connection:
+            _merge_duplicate_holdings(connection)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+    except SQLAlchemyError as e:
+        print(f"Warning: could not migrate database indexes - {e}")
+
     # Return session maker
     return sessionmaker(bind=engine)
 
+def _merge_duplicate_holdings(connection):
+    """Fold repeated (account_id, symbol) holdings into one row so the unique index can be created"""
+    duplicates = connection.execute(
+        select(Holding.account_id, Holding.symbol, func.min(Holding.id), func.sum(Holding.balance))
+        .group_by(Holding.account_id, Holding.symbol)
+        .having(func.count() > 1)
+    ).all()
+
+    for account_id, symbol, keep_id, balance in duplicates:
+        connection.execute(update(Holding).where(Holding.id == keep_id).values(balance=balance))
+        connection.execute(delete(Holding).where(
+            Holding.account_id == account_id,
+            Holding.symbol == symbol,
+            Holding.id != keep_id
+        ))
+
 def get_session():
-    """Get database session"""
+    """Get database session from the shared engine's session maker"""
     SessionLocal = init_database()
     return SessionLocal()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -22,13 +22,16 @@ class Account(Base):
     # Metadata
     created_at = Column(DateTime, default=datetime.now)
     last_updated = Column(DateTime, default=datetime.now, onupdate=datetime.now)
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
 
     # Relationships
     holdings = relationship("Holding", back_populates="account", cascade="all, delete-orphan")
 
 class Holding(Base):
     __tablename__ = 'holdings'
+    __table_args__ = (
+        Index('uq_holding_account_symbol', 'account_id', 'symbol', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
@@ -42,6 +45,9 @@ class Holding(Base):
 
 class PriceCache(Base):
     __tablename__ = 'price_cache'
+    __table_args__ = (
+        Index('ix_price_cache_symbol_currency', 'symbol', 'currency', 'cached_at'),
+    )
 
     id = Column(Integer, primary_key=True)
     symbol = Column(String(20), nullable=False)
@@ -1,31 +1,93 @@
-from typing import Dict, List, Optional
+import copy
+import threading
+from cachetools import TTLCache
+from cachetools.func import ttl_cache
+from typing import Dict, List, Optional, Tuple
 from services.security.session_manager import SecureSessionManager
 from services.blockchain.ethereum import EthereumClient
 from services.blockchain.bitcoin import BitcoinClient
 from services.exchanges.exchange_client import ExchangeClient
 from services.pricing.coingecko import CoinGeckoClient
 from database.init_db import get_session
-from database.crud import AccountCRUD, HoldingCRUD
+from database.crud import AccountCRUD, HoldingCRUD, PriceCRUD
+from services.models_runtime import Account, Asset, ExchangeAccount, WalletAccount
+from config.settings import get_settings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+# Account values keyed on (id, last refresh, currency, prices used), shared across reruns and sessions
+_account_values = TTLCache(maxsize=256, ttl=60)
+_account_values_lock = threading.Lock()
+
+def wallet_account_id(blockchain: str, address: str) -> str:
+    """Account id for a wallet; the same wallet always gets the same id"""
+    return f"wallet_{blockchain}_{address}"
+
+@ttl_cache(maxsize=1, ttl=300)
+def _load_accounts_cached() -> List[Account]:
+    """Load account metadata from database; shared, so callers must copy it"""
+    session = get_session()
+    accounts = []
+
+    try:
+        db_accounts = AccountCRUD.get_all_accounts_with_holdings(session)
+
+        for db_account in db_accounts:
+            account = {
+                'id': (wallet_account_id(db_account.blockchain, db_account.wallet_address)
+                       if db_account.account_type == 'wallet' else f"exchange_{db_account.id}"),
+                'db_id': db_account.id,
+                'type': db_account.account_type,
+                'name': db_account.name,
+                'last_updated': db_account.last_updated,
+                'data': None  # Will need refresh
+            }
+
+            if db_account.account_type == 'wallet':
+                account['blockchain'] = db_account.blockchain
+                account['address'] = db_account.wallet_address
+            elif db_account.account_type == 'exchange':
+                account['exchange'] = db_account.exchange_name
+                account['requires_credentials'] = True
+
+            # Load cached holdings (eagerly loaded with the account)
+            account['cached_holdings'] = [
+                {'symbol': h.symbol, 'balance': h.balance}
+                for h in db_account.holdings
+            ]
+
+            accounts.append(account)
+
+    finally:
+        session.close()
+
+    return accounts
+
+@lru_cache(maxsize=1)
+def get_blockchain_clients() -> Dict:
+    """Get blockchain clients, created once per process and shared"""
+    clients = {}
+
+    # Initialize blockchain clients only if API keys are available
+    try:
+        clients['ethereum'] = EthereumClient()
+    except ValueError as e:
+        print(f"Warning: Ethereum client not available - {e}")
+
+    # Bitcoin doesn't require API key
+    clients['bitcoin'] = BitcoinClient()
+    return clients
 
 class AccountManager:
     """Manage accounts and fetch data using session credentials"""
 
     def __init__(self):
         self.price_client = CoinGeckoClient()
-        self.blockchain_clients = {}
+        self.blockchain_clients = get_blockchain_clients()
 
-        # Initialize blockchain clients only if API keys are available
-        try:
-            self.blockchain_clients['ethereum'] = EthereumClient()
-        except ValueError as e:
-            print(f"Warning: Ethereum client not available - {e}")
-
-        # Bitcoin doesn't require API key
-        self.blockchain_clients['bitcoin'] = BitcoinClient()
-
-    def add_wallet_account(self, name: str, blockchain: str, address: str) -> Dict:
-        """Add wallet account and fetch data"""
+    def get_wallet_data(self, blockchain: str, address: str) -> Dict:
+        """Validate a wallet address and fetch its data"""
         if blockchain not in self.blockchain_clients:
             raise ValueError(f"Unsupported blockchain: {blockchain}")
 
@@ -35,12 +97,17 @@ class AccountManager:
         if not client.validate_address(address):
             raise ValueError(f"Invalid {blockchain} address")
 
-        # Fetch wallet data
-        wallet_data = client.get_wallet_data(address)
+        return client.get_wallet_data(address)
+
+    def add_wallet_account(self, name: str, blockchain: str, address: str,
+                           wallet_data: Optional[Dict] = None) -> WalletAccount:
+        """Add wallet account, fetching its data unless it was already fetched"""
+        if wallet_data is None:
+            wallet_data = self.get_wallet_data(blockchain, address)
 
         # Create account object
         account = {
-            'id': f"wallet_{blockchain}_{address[:8]}",
+            'id': wallet_account_id(blockchain, address),
             'type': 'wallet',
             'name': name,
             'blockchain': blockchain,
@@ -51,24 +118,25 @@ class AccountManager:
 
         return account
 
-    def add_exchange_account(self, name: str, exchange: str, api_key: str, api_secret: str) -> Dict:
+    def add_exchange_account(self, name: str, exchange: str, api_key: str, api_secret: str) -> ExchangeAccount:
         """Add exchange account with session-stored credentials"""
         exchange_client = ExchangeClient(exchange)
+        ccxt_exchange = exchange_client.build_exchange(api_key, api_secret)
 
         # Test connection
         try:
-            exchange_client.test_connection(api_key, api_secret)
+            exchange_client.test_connection(api_key, api_secret, ccxt_exchange)
         except Exception as e:
             raise ValueError(f"Failed to connect to {exchange}: {str(e)}")
 
         # Fetch initial data
-        balances = exchange_client.fetch_balances(api_key, api_secret)
+        balances = exchange_client.fetch_balances(api_key, api_secret, ccxt_exchange)
 
         # Generate account ID
         account_id = f"exchange_{exchange}_{name.lower().replace(' ', '_')}"
 
-        # Store credentials in session
-        SecureSessionManager.store_credential(account_id, api_key, api_secret)
+        # Store credentials in session, with the exchange client holding them
+        SecureSessionManager.store_credential(account_id, api_key, api_secret, ccxt_exchange)
 
         # Create account object (NO credentials stored here)
         account = {
@@ -82,16 +150,59 @@ class AccountManager:
 
         return account
 
-    def refresh_account_data(self, account: Dict) -> Dict:
-        """Refresh account data"""
+    def refresh_account_data(self, account: Account, credentials: Optional[Dict] = None) -> Account:
+        """Refresh account data (exchange credentials default to the session's)"""
         if account['type'] == 'wallet':
             return self._refresh_wallet(account)
         elif account['type'] == 'exchange':
-            return self._refresh_exchange(account)
+            return self._refresh_exchange(account, credentials)
         else:
             raise ValueError(f"Unknown account type: {account['type']}")
 
-    def _refresh_wallet(self, account: Dict) -> Dict:
+    def refresh_all(self, accounts: List[Account], max_workers: int = 8) -> List[Optional[Exception]]:
+        """Refresh accounts concurrently; returns None or the raised error per account"""
+        if not accounts:
+            return []
+
+        # Session state is only available on the script thread, so resolve
+        # exchange credentials before fanning out
+        credentials = {
+            account['id']: SecureSessionManager.get_credential(account['id']) or {}
+            for account in accounts
+            if account['type'] == 'exchange'
+        }
+
+        natives = self._prefetch_eth_balances(accounts)
+
+        def refresh(account: Account) -> Optional[Exception]:
+            try:
+                if account['type'] == 'wallet':
+                    self._refresh_wallet(account, natives.get(account['address'].lower()))
+                else:
+                    self.refresh_account_data(account, credentials.get(account['id']))
+                return None
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(accounts))) as executor:
+            return list(executor.map(refresh, accounts))
+
+    def _prefetch_eth_balances(self, accounts: List[Account]) -> Dict[str, Dict]:
+        """Batch-fetch native ETH balances for several wallets; empty on failure"""
+        addresses = [
+            account['address'] for account in accounts
+            if account['type'] == 'wallet' and account['blockchain'] == 'ethereum'
+        ]
+        if len(addresses) < 2 or 'ethereum' not in self.blockchain_clients:
+            return {}
+
+        try:
+            return self.blockchain_clients['ethereum'].get_native_balances(addresses)
+        except Exception as e:
+            print(f"Warning: Batched ETH balance lookup failed, fetching per wallet - {e}")
+            return {}
+
+    def _refresh_wallet(self, account: WalletAccount, native: Optional[Dict] = None) -> WalletAccount:
         """Refresh wallet data"""
         blockchain = account['blockchain']
         address = account['address']
@@ -100,54 +211,81 @@ class AccountManager:
             raise ValueError(f"Blockchain client not available for {blockchain}")
 
         client = self.blockchain_clients[blockchain]
-        wallet_data = client.get_wallet_data(address)
+        wallet_data = client.get_wallet_data(address, native)
 
         account['data'] = wallet_data
         account['last_updated'] = datetime.now()
         return account
 
-    def _refresh_exchange(self, account: Dict) -> Dict:
+    def _refresh_exchange(self, account: ExchangeAccount, credentials: Optional[Dict] = None) -> ExchangeAccount:
         """Refresh exchange data using session credentials"""
         account_id = account['id']
 
         # Get credentials from session
-        credentials = SecureSessionManager.get_credential(account_id)
+        if credentials is None:
+            credentials = SecureSessionManager.get_credential(account_id)
         if not credentials:
             raise ValueError(f"Session expired for {account['name']}. Please re-enter API keys.")
 
-        # Fetch fresh data
+        # Fetch fresh data, reusing the session's exchange client for this account
         exchange_client = ExchangeClient(account['exchange'])
+        if credentials.get('exchange') is None:
+            credentials['exchange'] = exchange_client.build_exchange(credentials['api_key'], credentials['api_secret'])
         balances = exchange_client.fetch_balances(
             credentials['api_key'],
-            credentials['api_secret']
+            credentials['api_secret'],
+            credentials['exchange']
         )
 
         account['data'] = balances
         account['last_updated'] = datetime.now()
         return account
 
-    def calculate_account_value(self, account: Dict, base_currency: str = 'usd') -> float:
-        """Calculate total account value in base currency"""
+    def calculate_account_value(self, account: Account, base_currency: str = 'usd',
+                                prices: Optional[Dict[str, float]] = None) -> float:
+        """Calculate total account value in base currency
+
+        ``prices`` is an optional symbol -> price memo for ``base_currency``;
+        pass the same dict for every account in one refresh pass so shared
+        symbols are only looked up once. Results are reused across reruns
+        until the account is refreshed or its prices change (or for a minute at most).
+        """
+        key = (account['id'], account.get('last_updated'), base_currency, self.get_price_key(account, prices))
+        with _account_values_lock:
+            value = _account_values.get(key)
+        if value is None:
+            value = self._compute_account_value(account, base_currency, prices)
+            with _account_values_lock:
+                _account_values[key] = value
+        return value
+
+    def get_price_key(self, account: Account, prices: Optional[Dict[str, float]]) -> Tuple:
+        """The (symbol, price) pairs an account is valued with, for keying cached values"""
+        if not account.get('data'):
+            return ()
+        prices = prices or {}
+        return tuple(
+            (symbol, prices.get(symbol))
+            for symbol in (asset['symbol'].upper() for asset in self._get_assets(account))
+        )
+
+    def _compute_account_value(self, account: Account, base_currency: str,
+                               prices: Optional[Dict[str, float]]) -> float:
+        """Sum balance * price over the account's assets"""
+        if prices is None:
+            prices = {}
         total = 0.0
 
         try:
-            if account['type'] == 'wallet':
-                # Native token
-                if 'native' in account['data'] and account['data']['native']:
-                    native = account['data']['native']
-                    price = self.price_client.get_price(native['symbol'], base_currency)
-                    total += native['balance'] * price
-
-                # Tokens
-                if 'tokens' in account['data']:
-                    for token in account['data']['tokens']:
-                        price = self.price_client.get_price(token['symbol'], base_currency)
-                        total += token['balance'] * price
-
-            elif account['type'] == 'exchange':
-                for asset in account['data']:
-                    price = self.price_client.get_price(asset['symbol'], base_currency)
-                    total += asset['balance'] * price
+            assets = self._get_assets(account)
+
+            # Price all not-yet-known symbols with a single batched lookup
+            missing = list({asset['symbol'].upper() for asset in assets} - prices.keys())
+            if missing:
+                prices.update(self._fetch_prices(missing, base_currency))
+
+            for asset in assets:
+                total += asset['balance'] * prices[asset['symbol'].upper()]
 
         except Exception as e:
             print(f"Error calculating value for {account['name']}: {e}")
@@ -155,112 +293,155 @@ class AccountManager:
 
         return total
 
-    def save_account_to_db(self, account: Dict):
-        """Save account metadata to database (NO credentials)"""
+    def get_prices(self, accounts: List[Account], base_currency: str = 'usd') -> Dict[str, float]:
+        """Look up prices for every symbol held across accounts in one batch"""
+        symbols = {
+            asset['symbol'].upper()
+            for account in accounts if account.get('data')
+            for asset in self._get_assets(account)
+        }
+        if not symbols:
+            return {}
+
+        try:
+            return self._fetch_prices(list(symbols), base_currency)
+        except Exception as e:
+            print(f"Error fetching portfolio prices: {e}")
+            return {}
+
+    def _fetch_prices(self, symbols: List[str], base_currency: str) -> Dict[str, float]:
+        """Get prices from the DB price cache, fetching stale/missing ones from CoinGecko"""
+        currency = base_currency.upper()
+        ttl = get_settings().PRICE_CACHE_TTL
         session = get_session()
 
         try:
-            if account['type'] == 'wallet':
-                db_account = AccountCRUD.create_wallet(
-                    session,
-                    name=account['name'],
-                    blockchain=account['blockchain'],
-                    address=account['address']
-                )
-            elif account['type'] == 'exchange':
-                db_account = AccountCRUD.create_exchange(
-                    session,
-                    name=account['name'],
-                    exchange_name=account['exchange']
-                )
-
-            # Save holdings
-            holdings = self._extract_holdings(account)
-            if holdings:
-                HoldingCRUD.update_holdings(session, db_account.id, holdings)
-
-            account['db_id'] = db_account.id
+            try:
+                prices = PriceCRUD.get_fresh_prices(session, symbols, currency, ttl)
+            except Exception as e:
+                print(f"Warning: price cache unavailable - {e}")
+                prices = {}
+
+            missing = [symbol for symbol in symbols if symbol not in prices]
+            if missing:
+                fetched = self.price_client.get_prices(missing, [base_currency])
+                fetched_prices = {
+                    symbol: fetched[symbol][base_currency]
+                    for symbol in missing
+                    if base_currency in fetched.get(symbol, {})
+                }
+                prices.update(fetched_prices)
 
+                try:
+                    PriceCRUD.upsert_prices(session, fetched_prices, currency)
+                except Exception as e:
+                    session.rollback()
+                    print(f"Warning: failed to cache prices - {e}")
         finally:
             session.close()
 
-        return account
+        # Unknown symbols are valued at 0
+        return {symbol: prices.get(symbol, 0) for symbol in symbols}
 
-    def load_accounts_from_db(self) -> List[Dict]:
-        """Load account metadata from database"""
+    def _get_assets(self, account: Account) -> List[Asset]:
+        """Get the non-zero assets (native, tokens or exchange balances) held by an account"""
+        if account['type'] == 'wallet':
+            assets = []
+            if 'native' in account['data'] and account['data']['native']:
+                assets.append(account['data']['native'])
+            if 'tokens' in account['data']:
+                assets.extend(account['data']['tokens'])
+        elif account['type'] == 'exchange':
+            assets = account['data']
+        else:
+            return []
+        # Zero balances add nothing to values but would still be priced and stored
+        return [asset for asset in assets if asset['balance'] > 0]
+
+    def save_account_to_db(self, account: Account) -> Account:
+        """Save account metadata to database (NO credentials)"""
+        return self.save_accounts_to_db([account])[0]
+
+    def save_accounts_to_db(self, accounts: List[Account]) -> List[Account]:
+        """Save metadata and holdings for several accounts in one transaction (NO credentials)"""
         session = get_session()
-        accounts = []
+        new_ids = {}
 
         try:
-            db_accounts = AccountCRUD.get_all_accounts(session)
-
-            for db_account in db_accounts:
-                account = {
-                    'id': f"{db_account.account_type}_{db_account.id}",
-                    'db_id': db_account.id,
-                    'type': db_account.account_type,
-                    'name': db_account.name,
-                    'last_updated': db_account.last_updated,
-                    'data': None  # Will need refresh
-                }
+            db_ids = []
+            for account in accounts:
+                # Accounts already in the DB are updated in place
+                db_id = account.get('db_id')
+                if db_id is None:
+                    if account['type'] == 'wallet':
+                        db_account = AccountCRUD.create_wallet(
+                            session,
+                            name=account['name'],
+                            blockchain=account['blockchain'],
+                            address=account['address'],
+                            commit=False
+                        )
+                    else:
+                        db_account = AccountCRUD.create_exchange(
+                            session,
+                            name=account['name'],
+                            exchange_name=account['exchange'],
+                            commit=False
+                        )
+                    db_id = new_ids[id(account)] = db_account.id
+                db_ids.append(db_id)
+
+                # Save holdings
+                if account.get('data') is not None:
+                    HoldingCRUD.update_holdings(session, db_id, self._extract_holdings(account), commit=False)
+
+            AccountCRUD.mark_updated(session, db_ids, commit=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        _load_accounts_cached.cache_clear()
 
-                if db_account.account_type == 'wallet':
-                    account['blockchain'] = db_account.blockchain
-                    account['address'] = db_account.wallet_address
-                elif db_account.account_type == 'exchange':
-                    account['exchange'] = db_account.exchange_name
-                    account['requires_credentials'] = True
+        for account in accounts:
+            if id(account) in new_ids:
+                account['db_id'] = new_ids[id(account)]
 
-                # Load cached holdings
-                holdings = HoldingCRUD.get_account_holdings(session, db_account.id)
-                account['cached_holdings'] = [
-                    {'symbol': h.symbol, 'balance': h.balance}
-                    for h in holdings
-                ]
+        return accounts
+
+    def load_accounts_from_db(self) -> List[Account]:
+        """Load account metadata from database (cached; saves and deletes invalidate it)"""
+        return copy.deepcopy(_load_accounts_cached())
 
-                accounts.append(account)
+    def delete_account(self, account: Account):
+        """Delete a saved account from database"""
+        if account.get('db_id') is None:
+            return
 
+        session = get_session()
+        try:
+            AccountCRUD.delete_account(session, account['db_id'])
         finally:
             session.close()
-
-        return accounts
+        _load_accounts_cached.cache_clear()
 
     def delete_all_accounts(self):
         """Delete all accounts from database"""
         session = get_session()
         try:
-            # Get all accounts
-            db_accounts = AccountCRUD.get_all_accounts(session)
-            # Delete each one
-            for db_account in db_accounts:
-                AccountCRUD.delete_account(session, db_account.id)
+            AccountCRUD.delete_all_accounts(session)
         finally:
             session.close()
+        _load_accounts_cached.cache_clear()
 
-    def _extract_holdings(self, account: Dict) -> List[Dict]:
+    def _extract_holdings(self, account: Account) -> List[Dict]:
         """Extract holdings from account data for DB storage"""
-        holdings = []
-
-        if account['type'] == 'wallet':
-            if 'native' in account['data'] and account['data']['native']:
-                holdings.append({
-                    'symbol': account['data']['native']['symbol'],
-                    'balance': account['data']['native']['balance']
-                })
-
-            if 'tokens' in account['data']:
-                for token in account['data']['tokens']:
-                    holdings.append({
-                        'symbol': token['symbol'],
-                        'balance': token['balance'],
-                        'token_address': token.get('token_address')
-                    })
-
-        elif account['type'] == 'exchange':
-            for asset in account['data']:
-                holdings.append({
-                    'symbol': asset['symbol'],
-                    'balance': asset['balance']
-                })
-
-        return holdings
+        return [
+            {
+                'symbol': asset['symbol'],
+                'balance': asset['balance'],
+                'token_address': asset.get('token_address')
+            }
+            for asset in self._get_assets(account)
+        ]
@@ -1,9 +1,71 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import requests
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from utils.circuit_breaker import get_circuit_breaker
+from utils.http import RateLimitError, create_session, parse_json
+
+def _parse_retry_after(response: requests.Response) -> Optional[float]:
+    """Read a numeric Retry-After header (seconds), if present"""
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, ValueError):
+        return None
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry transient failures only (network errors, rate limits, 5xx)"""
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code >= 500
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, RateLimitError))
+
+_backoff = wait_exponential_jitter(initial=2, max=10, jitter=2)
+
+def _wait_for_retry(retry_state) -> float:
+    """Honor Retry-After on rate limits, otherwise back off exponentially with jitter"""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, RateLimitError) and exc.retry_after is not None:
+        return min(exc.retry_after, 60)
+    return _backoff(retry_state)
 
 class BlockchainClient(ABC):
     """Abstract base class for blockchain clients"""
 
+    def __init__(self):
+        # Shared HTTP session so connections are reused across API calls; concurrent
+        # refreshes wait for a pooled connection instead of opening throwaway ones
+        self._session = create_session(pool_block=True)
+
+    def _get_json(self, url: str, params: Dict = None) -> Dict:
+        """GET a JSON endpoint, failing fast while its host is down"""
+        return get_circuit_breaker(urlparse(url).netloc).call(self._fetch_json, url, params)
+
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(3),
+        wait=_wait_for_retry,
+        reraise=True
+    )
+    def _fetch_json(self, url: str, params: Dict = None) -> Dict:
+        """GET a JSON endpoint, retrying only the request on transient errors"""
+        self._before_request()
+        response = self._session.get(url, params=params, timeout=10)
+        if response.status_code == 429:
+            raise RateLimitError(f"Rate limited by {url}", retry_after=_parse_retry_after(response))
+        response.raise_for_status()
+
+        data = parse_json(response)
+        if self._is_rate_limited(data):
+            raise RateLimitError(f"Rate limited by {url}", data=data)
+        return data
+
+    def _before_request(self):
+        """Hook run before every HTTP attempt, including retries (e.g. to pace requests)"""
+
+    def _is_rate_limited(self, data: Dict) -> bool:
+        """Detect rate-limit errors reported in a successful response body"""
+        return False
+
     @abstractmethod
     def get_native_balance(self, address: str) -> Dict:
         """Get native token balance (ETH, BTC, etc.)"""
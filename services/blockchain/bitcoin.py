@@ -1,6 +1,4 @@
-import requests
-from typing import Dict, List
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import Dict, List, Optional
 from services.blockchain.base import BlockchainClient
 from services.security.validation import InputValidator
 
@@ -11,18 +9,14 @@ class BitcoinClient(BlockchainClient):
 
     def validate_address(self, address: str) -> bool:
         """Validate Bitcoin address"""
-        valid, _ = InputValidator.validate_btc_address(address)
-        return valid
+        return InputValidator.is_btc_address(address)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def get_native_balance(self, address: str) -> Dict:
         """Get BTC balance"""
         if not self.validate_address(address):
             raise ValueError(f"Invalid Bitcoin address: {address}")
 
-        response = requests.get(f"{self.BASE_URL}/balance?active={address}")
-        response.raise_for_status()
-        data = response.json()
+        data = self._get_json(f"{self.BASE_URL}/balance", params={'active': address})
 
         if address not in data:
             raise ValueError(f"Address not found: {address}")
@@ -41,9 +35,10 @@ class BitcoinClient(BlockchainClient):
         """Bitcoin doesn't have tokens"""
         return []
 
-    def get_wallet_data(self, address: str) -> Dict:
+    def get_wallet_data(self, address: str, native: Optional[Dict] = None) -> Dict:
         """Get Bitcoin wallet data"""
-        native = self.get_native_balance(address)
+        if native is None:
+            native = self.get_native_balance(address)
 
         return {
             'native': native,
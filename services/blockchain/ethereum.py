@@ -1,82 +1,140 @@
 import requests
-from typing import Dict, List
-from tenacity import retry, stop_after_attempt, wait_exponential, RetryError
-from config.settings import settings
-from services.blockchain.base import BlockchainClient
+import threading
+from cachetools import TTLCache
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AbstractSet, Dict, List, Optional
+from config.settings import get_settings
+from services.blockchain.base import BlockchainClient, RateLimitError
+from services.blockchain.rate_limiter import TokenBucket
 from services.security.validation import InputValidator
+from utils.circuit_breaker import CircuitOpenError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# ERC-20 token metadata
+TokenInfo = namedtuple('TokenInfo', 'symbol decimals name')
+
+# Static Etherscan query parameters (apikey and address are added per client/call)
+_BALANCE_PARAMS = {'module': 'account', 'action': 'balance', 'tag': 'latest'}
+_BALANCEMULTI_PARAMS = {'module': 'account', 'action': 'balancemulti', 'tag': 'latest'}
+_TOKENTX_PARAMS = {'module': 'account', 'action': 'tokentx', 'startblock': 0, 'endblock': 99999999, 'sort': 'desc', 'offset': 200}
+_TOKEN_BALANCE_PARAMS = {'module': 'account', 'action': 'tokenbalance', 'tag': 'latest'}
+
+@lru_cache(maxsize=None)
+def _etherscan_limiter(rate_limit: int) -> TokenBucket:
+    """Etherscan request limiter, shared by all clients in the process"""
+    return TokenBucket(rate=rate_limit, capacity=rate_limit)
+
+# Token contracts discovered from tokentx history, keyed by lowercased wallet address
+_contract_cache = TTLCache(maxsize=256, ttl=3600)
+_contract_cache_lock = threading.Lock()
+
+# Wallets with no token transfer history, re-probed after a few minutes
+_empty_wallets = TTLCache(maxsize=1024, ttl=300)
+
+def _remember_contracts(address: str, contracts: Dict[str, TokenInfo]):
+    """Cache a completed tokentx discovery for the wallet"""
+    with _contract_cache_lock:
+        _contract_cache[address.lower()] = contracts
+
 class EthereumClient(BlockchainClient):
     """Etherscan API client for Ethereum data"""
 
     BASE_URL = "https://api.etherscan.io/v2/api"
     CHAIN_ID = 1  # Ethereum mainnet
 
-    # Top ERC-20 tokens by market cap (prioritize checking these first)
+    MAX_ADDITIONAL_TOKENS = 20  # Tokens from tx history checked beyond MAJOR_TOKENS
+    TOKENTX_PAGE_SIZE = _TOKENTX_PARAMS['offset']
+    TOKENTX_MAX_RESULTS = 10000  # Etherscan caps page * offset at 10k records
+    BALANCEMULTI_MAX_ADDRESSES = 20  # Etherscan limit per balancemulti call
+
+    # Top ERC-20 tokens by market cap (prioritize checking these first), keyed by lowercased contract
     MAJOR_TOKENS = {
-        '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48': {'symbol': 'USDC', 'decimals': 6, 'name': 'USD Coin'},
-        '0xdAC17F958D2ee523a2206206994597C13D831ec7': {'symbol': 'USDT', 'decimals': 6, 'name': 'Tether USD'},
-        '0x6B175474E89094C44Da98b954EedeAC495271d0F': {'symbol': 'DAI', 'decimals': 18, 'name': 'Dai Stablecoin'},
-        '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2': {'symbol': 'WETH', 'decimals': 18, 'name': 'Wrapped Ether'},
-        '0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599': {'symbol': 'WBTC', 'decimals': 8, 'name': 'Wrapped Bitcoin'},
-        '0x514910771AF9Ca656af840dff83E8264EcF986CA': {'symbol': 'LINK', 'decimals': 18, 'name': 'ChainLink Token'},
-        '0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984': {'symbol': 'UNI', 'decimals': 18, 'name': 'Uniswap'},
-        '0x7D1AfA7B718fb893dB30A3aBc0Cfc608AaCfeBB0': {'symbol': 'MATIC', 'decimals': 18, 'name': 'Matic Token'},
-        '0x0bc529c00C6401aEF6D220BE8C6Ea1667F6Ad93e': {'symbol': 'YFI', 'decimals': 18, 'name': 'yearn.finance'},
-        '0x7Fc66500c84A76Ad7e9c93437bFc5Ac33E2DDaE9': {'symbol': 'AAVE', 'decimals': 18, 'name': 'Aave Token'},
-        '0x4d224452801ACEd8B2F0aebE155379bb5D594381': {'symbol': 'APE', 'decimals': 18, 'name': 'ApeCoin'},
-        '0x95aD61b0a150d79219dCF64E1E6Cc01f0B64C4cE': {'symbol': 'SHIB', 'decimals': 18, 'name': 'SHIBA INU'},
-        '0x6982508145454Ce325dDbE47a25d4ec3d2311933': {'symbol': 'PEPE', 'decimals': 18, 'name': 'Pepe'},
-        '0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84': {'symbol': 'stETH', 'decimals': 18, 'name': 'Lido Staked Ether'},
+        '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48': TokenInfo('USDC', 6, 'USD Coin'),
+        '0xdac17f958d2ee523a2206206994597c13d831ec7': TokenInfo('USDT', 6, 'Tether USD'),
+        '0x6b175474e89094c44da98b954eedeac495271d0f': TokenInfo('DAI', 18, 'Dai Stablecoin'),
+        '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2': TokenInfo('WETH', 18, 'Wrapped Ether'),
+        '0x2260fac5e5542a773aa44fbcfedf7c193bc2c599': TokenInfo('WBTC', 8, 'Wrapped Bitcoin'),
+        '0x514910771af9ca656af840dff83e8264ecf986ca': TokenInfo('LINK', 18, 'ChainLink Token'),
+        '0x1f9840a85d5af5bf1d1762f925bdaddc4201f984': TokenInfo('UNI', 18, 'Uniswap'),
+        '0x7d1afa7b718fb893db30a3abc0cfc608aacfebb0': TokenInfo('MATIC', 18, 'Matic Token'),
+        '0x0bc529c00c6401aef6d220be8c6ea1667f6ad93e': TokenInfo('YFI', 18, 'yearn.finance'),
+        '0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9': TokenInfo('AAVE', 18, 'Aave Token'),
+        '0x4d224452801aced8b2f0aebe155379bb5d594381': TokenInfo('APE', 18, 'ApeCoin'),
+        '0x95ad61b0a150d79219dcf64e1e6cc01f0b64c4ce': TokenInfo('SHIB', 18, 'SHIBA INU'),
+        '0x6982508145454ce325ddbe47a25d4ec3d2311933': TokenInfo('PEPE', 18, 'Pepe'),
+        '0xae7ab96520de3a18e5e111b5eaab095312d7fe84': TokenInfo('stETH', 18, 'Lido Staked Ether'),
     }
+    DECIMAL_SCALES = {contract: 10 ** info.decimals for contract, info in MAJOR_TOKENS.items()}
 
     def __init__(self):
+        super().__init__()
+        settings = get_settings()
         self.api_key = settings.ETHERSCAN_API_KEY
+        self.rate_limit = settings.ETHERSCAN_RATE_LIMIT
         if not self.api_key:
             raise ValueError("ETHERSCAN_API_KEY not set in environment variables. Please add it to your .env file.")
 
+        # Pre-built request templates, copied and completed per call
+        common = {'chainid': self.CHAIN_ID, 'apikey': self.api_key}
+        self._balance_params = {**_BALANCE_PARAMS, **common}
+        self._balancemulti_params = {**_BALANCEMULTI_PARAMS, **common}
+        self._tokentx_params = {**_TOKENTX_PARAMS, **common}
+        self._token_balance_params = {**_TOKEN_BALANCE_PARAMS, **common}
+
+    def _etherscan_get(self, params: Dict) -> Dict:
+        """Call the Etherscan API, paced to ETHERSCAN_RATE_LIMIT"""
+        try:
+            return self._get_json(self.BASE_URL, params)
+        except RateLimitError as e:
+            if e.data is not None:
+                return e.data  # Retries exhausted; let the caller report the rate limit
+            raise
+
+    def _before_request(self):
+        """Take a rate-limit token for every request attempt, retries included"""
+        _etherscan_limiter(self.rate_limit).acquire()
+
+    def _is_rate_limited(self, data: Dict) -> bool:
+        """Etherscan reports rate limits as status 0 with a 200 response"""
+        return data.get('status') == '0' and 'rate limit' in str(data.get('result', '')).lower()
+
+    def _check_response(self, data: Dict):
+        """Raise a descriptive ValueError for a failed Etherscan response"""
+        if data['status'] != '1':
+            error_msg = data.get('message', 'Unknown error')
+            result = str(data.get('result', ''))  # balancemulti can report errors with a list result
+
+            # Handle specific error cases
+            if 'invalid api key' in error_msg.lower() or 'invalid api key' in result.lower():
+                raise ValueError("Invalid Etherscan API key. Please check your ETHERSCAN_API_KEY in .env file")
+            elif 'rate limit' in error_msg.lower() or 'rate limit' in result.lower():
+                raise ValueError("Etherscan API rate limit exceeded. Please wait a moment and try again")
+            elif 'deprecated' in error_msg.lower() or 'deprecated' in result.lower():
+                raise ValueError("Etherscan API error: Using deprecated V1 endpoint. Please update to V2 (already fixed in code, restart app)")
+            else:
+                raise ValueError(f"Etherscan API error: {error_msg}")
+
     def validate_address(self, address: str) -> bool:
         """Validate Ethereum address"""
-        valid, _ = InputValidator.validate_eth_address(address)
-        return valid
+        return InputValidator.is_eth_address(address)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def get_native_balance(self, address: str) -> Dict:
         """Get ETH balance"""
         if not self.validate_address(address):
             raise ValueError(f"Invalid Ethereum address: {address}")
 
-        params = {
-            'chainid': self.CHAIN_ID,
-            'module': 'account',
-            'action': 'balance',
-            'address': address,
-            'tag': 'latest',
-            'apikey': self.api_key
-        }
+        params = {**self._balance_params, 'address': address}
 
         try:
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._etherscan_get(params)
 
             logger.info(f"Etherscan API response: {data}")
 
-            if data['status'] != '1':
-                error_msg = data.get('message', 'Unknown error')
-                result = data.get('result', '')
-
-                # Handle specific error cases
-                if 'invalid api key' in error_msg.lower() or 'invalid api key' in result.lower():
-                    raise ValueError("Invalid Etherscan API key. Please check your ETHERSCAN_API_KEY in .env file")
-                elif 'rate limit' in error_msg.lower() or 'rate limit' in result.lower():
-                    raise ValueError("Etherscan API rate limit exceeded. Please wait a moment and try again")
-                elif 'deprecated' in error_msg.lower() or 'deprecated' in result.lower():
-                    raise ValueError("Etherscan API error: Using deprecated V1 endpoint. Please update to V2 (already fixed in code, restart app)")
-                else:
-                    raise ValueError(f"Etherscan API error: {error_msg}")
+            self._check_response(data)
 
             # Convert Wei to ETH
             balance_wei = int(data['result'])
@@ -87,115 +145,182 @@ class EthereumClient(BlockchainClient):
                 'balance': balance_eth,
                 'address': address
             }
+        except RateLimitError as e:
+            logger.error(f"Etherscan API rate limit persisted through retries: {e}")
+            raise ValueError("Etherscan API rate limit exceeded. Please wait a moment and try again")
+        except CircuitOpenError as e:
+            logger.error(f"Etherscan API circuit open: {e}")
+            raise ValueError(f"Etherscan API temporarily disabled after repeated failures ({e})")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Network error calling Etherscan API: {e}")
+            raise ValueError(f"Network error: Unable to connect to Etherscan API. Please check your internet connection")
+
+    def get_native_balances(self, addresses: List[str]) -> Dict[str, Dict]:
+        """Get ETH balances for several addresses via balancemulti, keyed by lowercased address"""
+        for address in addresses:
+            if not self.validate_address(address):
+                raise ValueError(f"Invalid Ethereum address: {address}")
+
+        balances = {}
+        step = self.BALANCEMULTI_MAX_ADDRESSES
+        try:
+            for start in range(0, len(addresses), step):
+                params = {**self._balancemulti_params, 'address': ','.join(addresses[start:start + step])}
+                data = self._etherscan_get(params)
+                self._check_response(data)
+
+                for entry in data['result']:
+                    balances[entry['account'].lower()] = {
+                        'symbol': 'ETH',
+                        'balance': int(entry['balance']) / 1e18,
+                        'address': entry['account']
+                    }
+        except RateLimitError as e:
+            logger.error(f"Etherscan API rate limit persisted through retries: {e}")
+            raise ValueError("Etherscan API rate limit exceeded. Please wait a moment and try again")
+        except CircuitOpenError as e:
+            logger.error(f"Etherscan API circuit open: {e}")
+            raise ValueError(f"Etherscan API temporarily disabled after repeated failures ({e})")
         except requests.exceptions.RequestException as e:
             logger.error(f"Network error calling Etherscan API: {e}")
             raise ValueError(f"Network error: Unable to connect to Etherscan API. Please check your internet connection")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+        return balances
+
     def get_token_balances(self, address: str) -> List[Dict]:
         """Get ERC-20 token balances with smart prioritization"""
         if not self.validate_address(address):
             raise ValueError(f"Invalid Ethereum address: {address}")
 
-        tokens = []
-        checked_contracts = set()
+        if not self._has_token_history(address):
+            logger.info(f"No token transfers for {address}, skipping token balance checks")
+            return []
 
-        # STEP 1: Check major tokens first (most likely to have value)
+        # STEP 1 + 2: Check major tokens first (most likely to have value) while
+        # discovering other tokens from recent transaction history in the background
         logger.info(f"Checking {len(self.MAJOR_TOKENS)} major tokens...")
-        for contract, info in self.MAJOR_TOKENS.items():
-            try:
-                balance = self._get_token_balance(address, contract)
-                if balance > 0:
-                    tokens.append({
-                        'symbol': info['symbol'],
-                        'balance': balance / (10 ** info['decimals']),
-                        'token_address': contract,
-                        'name': info['name']
-                    })
-                    logger.info(f"Found {info['symbol']}: {balance / (10 ** info['decimals'])}")
-                checked_contracts.add(contract.lower())
-            except Exception as e:
-                logger.debug(f"Error checking {info['symbol']}: {e}")
-                continue
-
-        # STEP 2: Get token transaction history
-        params = {
-            'chainid': self.CHAIN_ID,
-            'module': 'account',
-            'action': 'tokentx',
-            'address': address,
-            'startblock': 0,
-            'endblock': 99999999,
-            'sort': 'desc',
-            'apikey': self.api_key
-        }
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            discovery = executor.submit(self._discover_token_contracts, address, self.MAJOR_TOKENS.keys())
 
-        try:
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            balances = self._get_token_balances_parallel(address, list(self.MAJOR_TOKENS))
+            tokens = self._scale_token_balances(self.MAJOR_TOKENS, balances)
 
-            if data['status'] != '1' or not data['result']:
-                return tokens  # Return major tokens if no transaction history
+            token_contracts = discovery.result()
+
+        # STEP 3: Check additional tokens from history (limit to 20 more)
+        logger.info(f"Checking up to {self.MAX_ADDITIONAL_TOKENS} additional tokens from transaction history...")
+        balances = self._get_token_balances_parallel(address, list(token_contracts))
+        tokens.extend(self._scale_token_balances(token_contracts, balances))
+
+        logger.info(f"Total tokens found: {len(tokens)}")
+        return tokens
+
+    def _scale_token_balances(self, contracts: Dict[str, TokenInfo], balances: Dict[str, Optional[int]]) -> List[Dict]:
+        """Convert non-zero raw balances to token amounts using each token's decimals"""
+        tokens = []
+        for contract, info in contracts.items():
+            balance = balances[contract]
+            if balance:
+                amount = balance / (self.DECIMAL_SCALES.get(contract) or 10 ** info.decimals)
+                tokens.append({
+                    'symbol': info.symbol,
+                    'balance': amount,
+                    'token_address': contract,
+                    'name': info.name
+                })
+                logger.info(f"Found {info.symbol}: {amount}")
+        return tokens
+
+    def _has_token_history(self, address: str) -> bool:
+        """Probe tokentx for a single record; a wallet that never received a token can't hold any"""
+        key = address.lower()
+        with _contract_cache_lock:
+            if key in _empty_wallets:
+                return False
+            if key in _contract_cache:
+                return True
+
+        params = {**self._tokentx_params, 'address': address, 'page': 1, 'offset': 1}
+        try:
+            data = self._etherscan_get(params)
         except requests.exceptions.RequestException as e:
-            logger.error(f"Network error fetching token transactions: {e}")
-            return tokens  # Return major tokens found so far
+            logger.debug(f"Token history probe failed for {address}: {e}")
+            return True  # Unknown - fall back to the full check
+
+        # Errors carry a message string in 'result'; only an empty list means no history
+        if isinstance(data.get('result'), list) and not data['result']:
+            with _contract_cache_lock:
+                _empty_wallets[key] = True
+            return False
+        return True
+
+    def _discover_token_contracts(self, address: str, exclude: AbstractSet[str]) -> Dict[str, TokenInfo]:
+        """Collect up to MAX_ADDITIONAL_TOKENS unseen token contracts from paginated tokentx history"""
+        with _contract_cache_lock:
+            cached = _contract_cache.get(address.lower())
+        if cached is not None:
+            logger.info(f"Using cached token contracts for {address}")
+            return dict(cached)
 
-        # STEP 3: Extract unique tokens from transaction history
         token_contracts = {}
-        for tx in data['result']:
-            contract = tx['contractAddress'].lower()
-            if contract not in checked_contracts and contract not in token_contracts:
-                token_contracts[contract] = {
-                    'symbol': tx['tokenSymbol'],
-                    'decimals': int(tx['tokenDecimal']) if tx['tokenDecimal'] else 18,
-                    'name': tx['tokenName']
-                }
-
-        # STEP 4: Check additional tokens from history (limit to 20 more)
-        logger.info(f"Checking up to 20 additional tokens from transaction history...")
-        additional_count = 0
-        max_additional = 20
-
-        for contract, info in token_contracts.items():
-            if additional_count >= max_additional:
-                break
+        page = 1
+
+        while page * self.TOKENTX_PAGE_SIZE <= self.TOKENTX_MAX_RESULTS:
+            params = {**self._tokentx_params, 'address': address, 'page': page}
 
             try:
-                balance = self._get_token_balance(address, contract)
-                if balance > 0:
-                    tokens.append({
-                        'symbol': info['symbol'],
-                        'balance': balance / (10 ** info['decimals']),
-                        'token_address': contract,
-                        'name': info['name']
-                    })
-                    logger.info(f"Found {info['symbol']}: {balance / (10 ** info['decimals'])}")
-                additional_count += 1
+                data = self._etherscan_get(params)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Network error fetching token transactions: {e}")
+                return token_contracts  # Use tokens discovered so far, uncached
+
+            if not isinstance(data.get('result'), list):
+                logger.error(f"Etherscan error fetching token transactions: {data.get('message', 'Unknown')}")
+                return token_contracts  # Rate limited or NOTOK - use tokens discovered so far, uncached
+            if data['status'] != '1' or not data['result']:
+                break  # No (more) transaction history
+
+            # Extract unique tokens, stopping as soon as the cap is reached
+            for tx in data['result']:
+                contract = tx['contractAddress'].lower()
+                if contract not in exclude and contract not in token_contracts:
+                    token_contracts[contract] = TokenInfo(
+                        tx['tokenSymbol'],
+                        int(tx['tokenDecimal']) if tx['tokenDecimal'] else 18,
+                        tx['tokenName']
+                    )
+                    if len(token_contracts) >= self.MAX_ADDITIONAL_TOKENS:
+                        _remember_contracts(address, token_contracts)
+                        return token_contracts
+
+            if len(data['result']) < self.TOKENTX_PAGE_SIZE:
+                break  # Last page
+            page += 1
+
+        _remember_contracts(address, token_contracts)
+        return token_contracts
+
+    def _get_token_balances_parallel(self, address: str, contracts: List[str]) -> Dict[str, Optional[int]]:
+        """Fetch raw balances for several token contracts concurrently (None on error)"""
+        if not contracts:
+            return {}
+
+        def fetch(contract: str) -> Optional[int]:
+            try:
+                return self._get_token_balance(address, contract)
             except Exception as e:
-                logger.debug(f"Error checking {info['symbol']}: {e}")
-                additional_count += 1
-                continue
+                logger.debug(f"Error checking {contract}: {e}")
+                return None
 
-        logger.info(f"Total tokens found: {len(tokens)}")
-        return tokens
+        with ThreadPoolExecutor(max_workers=min(self.rate_limit, len(contracts))) as executor:
+            return dict(zip(contracts, executor.map(fetch, contracts)))
 
     def _get_token_balance(self, address: str, contract: str) -> int:
         """Get balance for specific ERC-20 token"""
-        params = {
-            'chainid': self.CHAIN_ID,
-            'module': 'account',
-            'action': 'tokenbalance',
-            'contractaddress': contract,
-            'address': address,
-            'tag': 'latest',
-            'apikey': self.api_key
-        }
+        params = {**self._token_balance_params, 'contractaddress': contract, 'address': address}
 
         try:
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._etherscan_get(params)
 
             if data['status'] == '1':
                 return int(data['result'])
@@ -208,10 +333,16 @@ class EthereumClient(BlockchainClient):
             logger.debug(f"Error fetching token balance for {contract}: {e}")
             return 0
 
-    def get_wallet_data(self, address: str) -> Dict:
-        """Get complete wallet data (native + tokens)"""
-        native = self.get_native_balance(address)
-        tokens = self.get_token_balances(address)
+    def get_wallet_data(self, address: str, native: Optional[Dict] = None) -> Dict:
+        """Get complete wallet data (native + tokens), reusing a prefetched native balance if given"""
+        if native is not None:
+            tokens = self.get_token_balances(address)
+        else:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                native_future = executor.submit(self.get_native_balance, address)
+                tokens_future = executor.submit(self.get_token_balances, address)
+                native = native_future.result()
+                tokens = tokens_future.result()
 
         return {
             'native': native,
@@ -1,7 +1,46 @@
 import ccxt
+import pickle
+import time
+from pathlib import Path
 from typing import Dict, List, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+# Exchange market metadata is large and rarely changes, so keep it on disk for a day
+MARKETS_CACHE_DIR = Path('.ccxt_cache')
+MARKETS_CACHE_TTL = 24 * 60 * 60
+
+def _build_exchange(exchange_class: type, api_key: str, api_secret: str) -> ccxt.Exchange:
+    """Build a configured CCXT exchange"""
+    return exchange_class({
+        'apiKey': api_key,
+        'secret': api_secret,
+        'enableRateLimit': True,
+        'options': {'defaultType': 'spot'}
+    })
+
+def _load_markets(exchange: ccxt.Exchange):
+    """Load markets from the on-disk cache, falling back to the exchange API"""
+    if exchange.markets:
+        return
+
+    cache_path = MARKETS_CACHE_DIR / f"{exchange.id}.pkl"
+    try:
+        if time.time() - cache_path.stat().st_mtime < MARKETS_CACHE_TTL:
+            with cache_path.open('rb') as f:
+                markets, currencies = pickle.load(f)
+            exchange.set_markets(markets, currencies)
+            return
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass  # Missing or unreadable cache - reload from the API
+
+    exchange.load_markets()
+    try:
+        MARKETS_CACHE_DIR.mkdir(exist_ok=True)
+        with cache_path.open('wb') as f:
+            pickle.dump((list(exchange.markets.values()), exchange.currencies), f)
+    except OSError as e:
+        print(f"Warning: Could not cache {exchange.id} markets - {e}")
+
 class ExchangeClient:
     """Unified exchange client using CCXT"""
 
@@ -22,33 +61,31 @@ class ExchangeClient:
         self.exchange_name = exchange_name
         self.exchange_class = self.SUPPORTED_EXCHANGES[exchange_name]
 
+    def build_exchange(self, api_key: str, api_secret: str) -> ccxt.Exchange:
+        """Build a CCXT exchange for these credentials; callers keep it only as long as the credentials"""
+        return _build_exchange(self.exchange_class, api_key, api_secret)
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def test_connection(self, api_key: str, api_secret: str) -> bool:
-        """Test exchange connection with credentials"""
-        exchange = self.exchange_class({
-            'apiKey': api_key,
-            'secret': api_secret,
-            'enableRateLimit': True,
-            'options': {'defaultType': 'spot'}
-        })
+    def test_connection(self, api_key: str, api_secret: str, exchange: Optional[ccxt.Exchange] = None) -> bool:
+        """Test exchange connection with credentials (reusing a built exchange if given)"""
+        if exchange is None:
+            exchange = self.build_exchange(api_key, api_secret)
 
         try:
             # Try to fetch balance (read-only operation)
+            _load_markets(exchange)
             exchange.fetch_balance()
             return True
         except Exception as e:
             raise ValueError(f"Connection test failed: {str(e)}")
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def fetch_balances(self, api_key: str, api_secret: str) -> List[Dict]:
-        """Fetch all balances from exchange"""
-        exchange = self.exchange_class({
-            'apiKey': api_key,
-            'secret': api_secret,
-            'enableRateLimit': True,
-            'options': {'defaultType': 'spot'}
-        })
+    def fetch_balances(self, api_key: str, api_secret: str, exchange: Optional[ccxt.Exchange] = None) -> List[Dict]:
+        """Fetch all balances from exchange (reusing a built exchange if given)"""
+        if exchange is None:
+            exchange = self.build_exchange(api_key, api_secret)
 
+        _load_markets(exchange)
         balance_data = exchange.fetch_balance()
 
         # Extract non-zero balances
@@ -48,11 +48,19 @@ class SupportedExchanges:
         }
     }
 
+    # Display names, built once for selectbox format_func lookups
+    EXCHANGE_NAMES = {exchange_id: info['name'] for exchange_id, info in EXCHANGES.items()}
+
     @staticmethod
     def get_exchange_list() -> List[str]:
         """Get list of supported exchange IDs"""
         return list(SupportedExchanges.EXCHANGES.keys())
 
+    @staticmethod
+    def get_exchange_names() -> Dict[str, str]:
+        """Get display names keyed by exchange ID"""
+        return SupportedExchanges.EXCHANGE_NAMES
+
     @staticmethod
     def get_exchange_info(exchange_id: str) -> Dict:
         """Get information about a specific exchange"""
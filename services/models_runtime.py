@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Dict, List, Optional, TypedDict, Union
+
+class Asset(TypedDict, total=False):
+    """A balance held in a wallet (native or token) or on an exchange"""
+    symbol: str
+    balance: float
+    address: str  # Native balances: wallet address
+    token_address: Optional[str]  # Tokens: contract address
+    name: str
+
+class WalletData(TypedDict):
+    """Balances fetched for a wallet"""
+    native: Asset
+    tokens: List[Asset]
+
+class CachedHolding(TypedDict):
+    """Holding loaded from the DB when live data is not yet available"""
+    symbol: str
+    balance: float
+
+class WalletAccount(TypedDict, total=False):
+    """In-memory wallet account (public address only)"""
+    id: str
+    db_id: int
+    type: str  # 'wallet'
+    name: str
+    blockchain: str
+    address: str
+    data: Optional[WalletData]
+    cached_holdings: List[CachedHolding]
+    last_updated: datetime
+
+class ExchangeAccount(TypedDict, total=False):
+    """In-memory exchange account (credentials live in the session only)"""
+    id: str
+    db_id: int
+    type: str  # 'exchange'
+    name: str
+    exchange: str
+    data: Optional[List[Asset]]
+    cached_holdings: List[CachedHolding]
+    requires_credentials: bool
+    last_updated: datetime
+
+Account = Union[WalletAccount, ExchangeAccount]
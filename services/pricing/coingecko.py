@@ -1,8 +1,9 @@
-import requests
 from typing import Dict, List
 from cachetools import TTLCache
 from tenacity import retry, stop_after_attempt, wait_exponential
 from config.settings import settings
+from utils.circuit_breaker import get_circuit_breaker
+from utils.http import create_session, parse_json
 from datetime import datetime
 
 class CoinGeckoClient:
@@ -46,7 +47,8 @@ class CoinGeckoClient:
 
     def __init__(self):
         self.api_key = settings.COINGECKO_API_KEY
-        self.cache = TTLCache(maxsize=100, ttl=settings.PRICE_CACHE_TTL)
+        self.cache = TTLCache(maxsize=1000, ttl=settings.PRICE_CACHE_TTL)
+        self._session = create_session()
 
     def _get_headers(self) -> Dict:
         """Get headers for API request"""
@@ -55,52 +57,58 @@ class CoinGeckoClient:
             headers['x-cg-pro-api-key'] = self.api_key
         return headers
 
+    def _fetch_prices(self, params: Dict) -> Dict:
+        """Call the /simple/price endpoint"""
+        response = self._session.get(
+            f"{self.BASE_URL}/simple/price",
+            params=params,
+            headers=self._get_headers(),
+            timeout=10
+        )
+        response.raise_for_status()
+        return parse_json(response)
+
     def get_prices(self, symbols: List[str], vs_currencies: List[str] = ['usd']) -> Dict:
         """Get prices for multiple symbols"""
-        cache_key = f"{','.join(sorted(symbols))}:{','.join(sorted(vs_currencies))}"
-
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-
         # Convert symbols to CoinGecko IDs
-        coin_ids = []
-        for symbol in symbols:
-            if symbol.upper() in self.SYMBOL_TO_ID:
-                coin_ids.append(self.SYMBOL_TO_ID[symbol.upper()])
+        upper_symbols = {symbol.upper() for symbol in symbols}
+        symbol_ids = {symbol: self.SYMBOL_TO_ID[symbol] for symbol in upper_symbols if symbol in self.SYMBOL_TO_ID}
 
-        if not coin_ids:
+        if not symbol_ids:
             return {}
 
-        # Make API request with error handling
-        try:
-            params = {
-                'ids': ','.join(coin_ids),
-                'vs_currencies': ','.join(vs_currencies)
-            }
-
-            response = requests.get(
-                f"{self.BASE_URL}/simple/price",
-                params=params,
-                headers=self._get_headers(),
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Convert back to symbol-based format
-            result = {}
-            for symbol in symbols:
-                coin_id = self.SYMBOL_TO_ID.get(symbol.upper())
-                if coin_id and coin_id in data:
-                    result[symbol.upper()] = data[coin_id]
-
-            self.cache[cache_key] = result
-            return result
-
-        except Exception as e:
-            print(f"Error fetching prices from CoinGecko: {e}")
-            # Return empty dict on error - let caller handle missing prices
-            return {}
+        # Only request coins with at least one uncached currency
+        missing_ids = sorted({
+            coin_id for coin_id in symbol_ids.values()
+            if any((coin_id, vs) not in self.cache for vs in vs_currencies)
+        })
+
+        if missing_ids:
+            # Make API request with error handling
+            try:
+                params = {
+                    'ids': ','.join(missing_ids),
+                    'vs_currencies': ','.join(vs_currencies)
+                }
+
+                data = get_circuit_breaker('api.coingecko.com').call(self._fetch_prices, params)
+
+                for coin_id, coin_prices in data.items():
+                    for vs, price in coin_prices.items():
+                        self.cache[(coin_id, vs)] = price
+
+            except Exception as e:
+                print(f"Error fetching prices from CoinGecko: {e}")
+                # Fall through with whatever is cached - let caller handle missing prices
+
+        # Convert back to symbol-based format
+        result = {}
+        for symbol, coin_id in symbol_ids.items():
+            coin_prices = {vs: self.cache[(coin_id, vs)] for vs in vs_currencies if (coin_id, vs) in self.cache}
+            if coin_prices:
+                result[symbol] = coin_prices
+
+        return result
 
     def get_price(self, symbol: str, vs_currency: str = 'usd') -> float:
         """Get price for a single symbol"""
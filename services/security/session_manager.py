@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Any, Optional, Dict
 import secrets
 
 class SecureSessionManager:
@@ -11,30 +11,32 @@ class SecureSessionManager:
     @staticmethod
     def init_session():
         """Initialize secure session"""
-        if 'session_id' not in st.session_state:
+        # clear_session() leaves session_id as None, so an expired session can start over
+        if st.session_state.get('session_id') is None:
             st.session_state.session_id = secrets.token_urlsafe(32)
             st.session_state.session_start = datetime.now()
             st.session_state.credentials = {}
-            st.session_state.accounts = []
+            st.session_state.accounts_by_id = {}
 
     @staticmethod
     def is_session_valid() -> bool:
         """Check if session is still valid"""
-        if 'session_start' not in st.session_state:
+        if st.session_state.get('session_start') is None:
             return False
 
         elapsed = datetime.now() - st.session_state.session_start
         return elapsed < SecureSessionManager.SESSION_TIMEOUT
 
     @staticmethod
-    def store_credential(account_id: str, api_key: str, api_secret: str):
-        """Store credential in secure session (memory only)"""
+    def store_credential(account_id: str, api_key: str, api_secret: str, exchange: Optional[Any] = None):
+        """Store credential (and the exchange client built from it) in secure session (memory only)"""
         if not SecureSessionManager.is_session_valid():
             raise ValueError("Session expired")
 
         st.session_state.credentials[account_id] = {
             'api_key': api_key,
             'api_secret': api_secret,
+            'exchange': exchange,
             'stored_at': datetime.now()
         }
 
@@ -51,30 +53,19 @@ class SecureSessionManager:
     def clear_session():
         """Clear all session data securely"""
         if 'credentials' in st.session_state:
-            # Overwrite memory before deletion
-            for cred_id in st.session_state.credentials:
-                st.session_state.credentials[cred_id] = {
-                    'api_key': '0' * 64,
-                    'api_secret': '0' * 64
-                }
-
-            st.session_state.credentials = {}
+            # Drop references to the secrets (Python strings can't be zeroed in place)
+            st.session_state.credentials.clear()
 
         st.session_state.session_id = None
         st.session_state.session_start = None
-        st.session_state.accounts = []
+        st.session_state.accounts_by_id = {}
 
     @staticmethod
     def clear_all_credentials():
         """Clear all credentials from session"""
         if 'credentials' in st.session_state:
-            # Overwrite memory before deletion
-            for cred_id in st.session_state.credentials:
-                st.session_state.credentials[cred_id] = {
-                    'api_key': '0' * 64,
-                    'api_secret': '0' * 64
-                }
-            st.session_state.credentials = {}
+            # Drop references to the secrets (Python strings can't be zeroed in place)
+            st.session_state.credentials.clear()
 
     @staticmethod
     def get_session_info() -> Dict:
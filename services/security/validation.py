@@ -4,11 +4,21 @@ from typing import Tuple
 class InputValidator:
     """Validate user inputs for security"""
 
-    # Ethereum address pattern
-    ETH_ADDRESS_PATTERN = re.compile(r'^0x[a-fA-F0-9]{40}$')
+    # Ethereum address pattern (used with fullmatch, so no anchors)
+    ETH_ADDRESS_PATTERN = re.compile(r'0x[a-fA-F0-9]{40}')
 
     # Bitcoin address patterns (simplified)
-    BTC_ADDRESS_PATTERN = re.compile(r'^(bc1|[13])[a-zA-HJ-NP-Z0-9]{25,62}$')
+    BTC_ADDRESS_PATTERN = re.compile(r'(?:bc1|[13])[a-zA-HJ-NP-Z0-9]{25,62}')
+
+    @staticmethod
+    def is_eth_address(address: str) -> bool:
+        """Fast boolean Ethereum address check (no error message)"""
+        return bool(address) and InputValidator.ETH_ADDRESS_PATTERN.fullmatch(address) is not None
+
+    @staticmethod
+    def is_btc_address(address: str) -> bool:
+        """Fast boolean Bitcoin address check (no error message)"""
+        return bool(address) and InputValidator.BTC_ADDRESS_PATTERN.fullmatch(address) is not None
 
     @staticmethod
     def validate_eth_address(address: str) -> Tuple[bool, str]:
@@ -16,7 +26,7 @@ class InputValidator:
         if not address:
             return False, "Address cannot be empty"
 
-        if not InputValidator.ETH_ADDRESS_PATTERN.match(address):
+        if not InputValidator.is_eth_address(address):
             return False, "Invalid Ethereum address format (must be 0x + 40 hex chars)"
 
         return True, "Valid"
@@ -27,7 +37,7 @@ class InputValidator:
         if not address:
             return False, "Address cannot be empty"
 
-        if not InputValidator.BTC_ADDRESS_PATTERN.match(address):
+        if not InputValidator.is_btc_address(address):
             return False, "Invalid Bitcoin address format"
 
         return True, "Valid"
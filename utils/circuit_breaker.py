@@ -0,0 +1,56 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable
+import requests
+from utils.http import RateLimitError
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an API whose circuit is open"""
+
+def _is_outage(exc: BaseException) -> bool:
+    """Count network errors and 5xx responses; 4xx and rate limits mean the service is up"""
+    if isinstance(exc, RateLimitError):
+        return False
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is None or exc.response.status_code >= 500
+    return isinstance(exc, requests.exceptions.RequestException)
+
+class CircuitBreaker:
+    """Fail fast after repeated API failures, allowing calls again after a cool-down"""
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func through the breaker"""
+        with self._lock:
+            if self._opened_at is not None:
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"{self.name} is unavailable, retrying in {remaining:.0f}s")
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if _is_outage(e):
+                with self._lock:
+                    self._failures += 1
+                    if self._failures >= self.fail_max:
+                        self._opened_at = time.monotonic()
+            raise
+
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+        return result
+
+@lru_cache(maxsize=None)
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for an API host"""
+    return CircuitBreaker(name)
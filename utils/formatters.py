@@ -1,24 +1,30 @@
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Union
 
+# Display formats per base currency (USD is the default)
+_CURRENCY_FORMATS = {
+    'BTC': "₿{:.8f}",
+    'ETH': "Ξ{:.6f}",
+    'EUR': "€{:,.2f}",
+    'USD': "${:,.2f}",
+}
+
+# Balance formats by magnitude: < 1, < 1000, >= 1000
+_BALANCE_THRESHOLDS = (1, 1000)
+_BALANCE_FORMATS = ("{:.8f} {}", "{:.4f} {}", "{:,.2f} {}")
+
+# Cards re-format the same balances and values on every rerun; inputs are
+# hashed as-is (not rounded) so cached output is identical to uncached
+@lru_cache(maxsize=4096)
 def format_currency(value: Union[float, int], currency: str) -> str:
     """Format currency display"""
-    if currency.upper() == 'BTC':
-        return f"₿{value:.8f}"
-    elif currency.upper() == 'ETH':
-        return f"Ξ{value:.6f}"
-    elif currency.upper() == 'EUR':
-        return f"€{value:,.2f}"
-    else:  # USD default
-        return f"${value:,.2f}"
+    return _CURRENCY_FORMATS.get(currency.upper(), _CURRENCY_FORMATS['USD']).format(value)
 
+@lru_cache(maxsize=4096)
 def format_balance(balance: float, symbol: str) -> str:
     """Format token balance"""
-    if balance >= 1000:
-        return f"{balance:,.2f} {symbol}"
-    elif balance >= 1:
-        return f"{balance:.4f} {symbol}"
-    else:
-        return f"{balance:.8f} {symbol}"
+    return _BALANCE_FORMATS[bisect_right(_BALANCE_THRESHOLDS, balance)].format(balance, symbol)
 
 def shorten_address(address: str, start: int = 6, end: int = 4) -> str:
     """Shorten blockchain address for display"""
@@ -0,0 +1,29 @@
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON decoding
+    orjson = None
+
+class RateLimitError(requests.exceptions.RequestException):
+    """Raised when an API rejects a request for exceeding its rate limit"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, data: Optional[Dict] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.data = data
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 20, pool_block: bool = False) -> requests.Session:
+    """Create a requests session with keep-alive connection pooling"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0, pool_block=pool_block)
+    session.mount('https://', adapter)
+    return session
+
+def parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
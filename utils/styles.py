@@ -0,0 +1,23 @@
+# Static page markup, built once per process instead of on every rerun
+
+WELCOME_HTML = """
+<div style="text-align: center; padding: 50px;">
+    <h2>🚀 Welcome to Your Crypto Portfolio Tracker!</h2>
+    <p style="font-size: 1.1rem; color: #666;">
+        Get started by adding your first DeFi wallet or exchange account using the sidebar.
+    </p>
+    <p style="color: #999;">
+        📱 Connect wallets from Ethereum, Bitcoin<br>
+        🏢 Link exchanges like Coinbase, Binance, Kraken<br>
+        📊 View everything in your preferred currency<br>
+        🔒 Session-only security - keys never saved
+    </p>
+</div>
+"""
+
+FOOTER_HTML = """
+<div style="text-align: center; color: #666; padding: 20px;">
+    <p>🔒 <strong>Security:</strong> API keys stored in session memory only • Cleared on browser close</p>
+    <p>⚠️ <strong>Important:</strong> Never share your private keys or seed phrases</p>
+</div>
+"""
@@ -1,13 +1,17 @@
+import logging
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 from tenacity import RetryError
 from services.security.session_manager import SecureSessionManager
-from services.account_manager import AccountManager
+from services.account_manager import AccountManager, wallet_account_id
 from services.exchanges.supported import SupportedExchanges
 from utils.formatters import format_currency, format_balance, shorten_address
 from utils.error_handler import ErrorHandler
+from utils.styles import WELCOME_HTML, FOOTER_HTML
+
+logger = logging.getLogger(__name__)
 
 # Page configuration
 st.set_page_config(
@@ -17,42 +21,68 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 3rem;
-        font-weight: bold;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 20px;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin: 10px 0;
-    }
-    .wallet-card {
-        border: 1px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        background-color: #f9f9f9;
-    }
-    .exchange-card {
-        border: 1px solid #4CAF50;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        background-color: #f1f8e9;
-    }
-</style>
-""", unsafe_allow_html=True)
+# cache_resource hands back the same figures instead of unpickling copies on every
+# rerun; st.plotly_chart only reads them
+@st.cache_resource(show_spinner=False, max_entries=32)
+def build_portfolio_figures(composition: tuple, base_currency: str):
+    """Build the composition pie and bar charts, cached per (composition, currency)"""
+    names, types, values, percentages = zip(*composition)
+    df_composition = pd.DataFrame({'Account': names, 'Type': types, 'Value': values, 'Percentage': percentages})
+
+    fig_pie = px.pie(
+        df_composition,
+        values='Value',
+        names='Account',
+        title=f"Portfolio Distribution ({base_currency.upper()})",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+    fig_bar = px.bar(
+        df_composition,
+        x='Account',
+        y='Value',
+        title=f"Account Values ({base_currency.upper()})",
+        color='Type',
+        text='Value'
+    )
+    fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+
+    return fig_pie, fig_bar
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_wallet_data(_account_manager: AccountManager, blockchain: str, address: str) -> dict:
+    """Get wallet data, reused across reruns and sessions for a minute; blockchain + address identify the wallet"""
+    return _account_manager.get_wallet_data(blockchain, address)
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def build_asset_table(_account: dict, _prices: dict, account_id: str, last_updated, base_currency: str,
+                      price_key: tuple) -> pd.DataFrame:
+    """Build an account's asset table, keyed like account values on (id, last refresh, currency, prices used)"""
+    symbols, balances, types, values = [], [], [], []
+
+    def add_asset(symbol: str, balance: float, asset_type: str):
+        value = balance * _prices.get(symbol.upper(), 0)
+        symbols.append(symbol)
+        balances.append(format_balance(balance, symbol))
+        types.append(asset_type)
+        values.append(format_currency(value, base_currency.upper()) if value > 0 else 'N/A')
+
+    # Zero-balance dust is dropped up front rather than rendered as 'N/A' rows
+    if _account['type'] == 'wallet' and _account.get('data'):
+        native = _account['data'].get('native')
+        if native and native['balance'] > 0:
+            add_asset(native['symbol'], native['balance'], 'Native')
+
+        tokens = [t for t in _account['data'].get('tokens', ()) if t['balance'] > 0]
+        for token in tokens:
+            add_asset(token['symbol'], token['balance'], 'Token')
+
+    elif _account['type'] == 'exchange' and _account.get('data'):
+        held = [a for a in _account['data'] if a['balance'] > 0]
+        for asset in held:
+            add_asset(asset['symbol'], asset['balance'], 'Exchange')
+
+    return pd.DataFrame({'Symbol': symbols, 'Balance': balances, 'Type': types, 'Value': values})
 
 # Initialize session
 SecureSessionManager.init_session()
@@ -65,10 +95,10 @@ if 'account_manager' not in st.session_state:
 if 'accounts_loaded' not in st.session_state:
     try:
         db_accounts = st.session_state.account_manager.load_accounts_from_db()
-        st.session_state.accounts = db_accounts
+        st.session_state.accounts_by_id = {account['id']: account for account in db_accounts}
         st.session_state.accounts_loaded = True
     except Exception as e:
-        st.session_state.accounts = []
+        st.session_state.accounts_by_id = {}
         st.session_state.accounts_loaded = True
 
 # Check session validity
@@ -76,20 +106,33 @@ session_info = SecureSessionManager.get_session_info()
 if not session_info['active']:
     st.warning("⚠️ Session expired. Your credentials have been cleared for security.")
     if st.button("Start New Session"):
+        # A timed-out session still has its id, so clear it before starting over
+        SecureSessionManager.clear_session()
         SecureSessionManager.init_session()
+        # Reload the saved accounts; the DB read is cached so this is usually free
+        del st.session_state.accounts_loaded
         st.rerun()
     st.stop()
 
+# Accounts keyed by id (insertion-ordered); this run works on list views of them,
+# bucketed by type once instead of re-filtering wherever a type is needed
+accounts = list(st.session_state.accounts_by_id.values())
+accounts_by_type = {'wallet': [], 'exchange': []}
+for account in accounts:
+    accounts_by_type[account['type']].append(account)
+wallets, exchanges = accounts_by_type['wallet'], accounts_by_type['exchange']
+
 # Header
-st.markdown('<h1 class="main-header">💰 Crypto Portfolio Tracker</h1>', unsafe_allow_html=True)
-st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666;">Track your DeFi wallets and centralized exchange holdings</p>', unsafe_allow_html=True)
+# Brand colours come from the .streamlit/config.toml theme, not injected CSS
+st.title("💰 Crypto Portfolio Tracker")
+st.caption("Track your DeFi wallets and centralized exchange holdings")
 
 # Sidebar for controls
 st.sidebar.header("⚙️ Settings")
 
 # Session info
 st.sidebar.caption(f"🔒 Session: {session_info['remaining_minutes']} min remaining")
-st.sidebar.caption(f"📊 Accounts: {len(st.session_state.accounts)}")
+st.sidebar.caption(f"📊 Accounts: {len(accounts)}")
 
 # Base currency selection
 base_currency = st.sidebar.selectbox(
@@ -102,33 +145,42 @@ base_currency = st.sidebar.selectbox(
 # Refresh button
 if st.sidebar.button("🔄 Refresh All", type="primary"):
     with st.spinner("Refreshing all accounts..."):
-        for account in st.session_state.accounts:
-            try:
-                # Skip if account needs credentials and doesn't have them
-                if account['type'] == 'exchange':
-                    credentials = SecureSessionManager.get_credential(account['id'])
-                    if not credentials:
-                        ErrorHandler.show_warning(f"{account['name']}: Session expired. Please re-add exchange to refresh.")
-                        continue
-
-                st.session_state.account_manager.refresh_account_data(account)
-                st.session_state.account_manager.save_account_to_db(account)
-            except RetryError as e:
+        to_refresh = list(wallets)
+        for account in exchanges:
+            # Skip if account needs credentials and doesn't have them
+            if not SecureSessionManager.get_credential(account['id']):
+                ErrorHandler.show_warning(f"{account['name']}: Session expired. Please re-add exchange to refresh.")
+                continue
+            to_refresh.append(account)
+
+        # Fetch concurrently, then report and save on the script thread
+        errors = st.session_state.account_manager.refresh_all(to_refresh)
+        refreshed = []
+        for account, error in zip(to_refresh, errors):
+            if isinstance(error, RetryError):
                 # Unwrap RetryError for better error messages
-                if e.last_attempt and e.last_attempt.exception():
-                    actual_error = str(e.last_attempt.exception())
+                if error.last_attempt and error.last_attempt.exception():
+                    actual_error = str(error.last_attempt.exception())
                     ErrorHandler.show_error(f"Failed to refresh {account['name']}", actual_error)
                 else:
                     ErrorHandler.show_error(f"Failed to refresh {account['name']}", "Connection failed after retries")
-            except Exception as e:
-                ErrorHandler.show_error(f"Failed to refresh {account['name']}", str(e))
+            elif error is not None:
+                ErrorHandler.show_error(f"Failed to refresh {account['name']}", str(error))
+            else:
+                refreshed.append(account)
+
+        # Save all refreshed accounts in one transaction
+        try:
+            st.session_state.account_manager.save_accounts_to_db(refreshed)
+        except Exception as e:
+            ErrorHandler.show_error("Failed to save refreshed accounts", str(e))
     st.rerun()
 
 # Clear all button
 if st.sidebar.button("🗑️ Clear All", type="secondary"):
-    if st.session_state.accounts:
+    if accounts:
         st.session_state.account_manager.delete_all_accounts()
-        st.session_state.accounts = []
+        st.session_state.accounts_by_id = {}
         SecureSessionManager.clear_all_credentials()
         ErrorHandler.show_success("All accounts cleared")
         st.rerun()
@@ -139,187 +191,114 @@ if st.sidebar.button("🗑️ Clear All", type="secondary"):
 st.sidebar.markdown("---")
 st.sidebar.header("➕ Add New Account")
 
-account_type = st.sidebar.radio("Account Type", ["DeFi Wallet", "Exchange"], key="account_type")
-
-if account_type == "DeFi Wallet":
-    with st.sidebar.form("add_wallet"):
-        st.markdown("### Add DeFi Wallet")
-        wallet_name = st.text_input("Wallet Name", placeholder="My ETH Wallet")
-        blockchain = st.selectbox("Blockchain", ['ethereum', 'bitcoin'])
-        wallet_address = st.text_input(
-            "Wallet Address",
-            placeholder="0x... or bc1...",
-            help="Only public addresses - never enter private keys!"
-        )
-
-        if st.form_submit_button("Add Wallet", type="primary"):
-            if wallet_name and wallet_address:
-                try:
-                    with st.spinner("Adding wallet..."):
-                        account = st.session_state.account_manager.add_wallet_account(
-                            wallet_name, blockchain, wallet_address
-                        )
-                        st.session_state.account_manager.save_account_to_db(account)
-                        st.session_state.accounts.append(account)
-                        ErrorHandler.show_success(f"Added {wallet_name}")
-                        st.rerun()
-                except RetryError as e:
-                    # Unwrap the RetryError to get the actual error
-                    if e.last_attempt and e.last_attempt.exception():
-                        actual_error = str(e.last_attempt.exception())
-                        ErrorHandler.show_error("Failed to add wallet", actual_error)
-                    else:
-                        ErrorHandler.show_error("Failed to add wallet", "Connection failed after multiple retries")
-                except ValueError as e:
-                    ErrorHandler.show_error("Failed to add wallet", str(e))
-                except Exception as e:
-                    ErrorHandler.show_error("Failed to add wallet", f"Unexpected error: {str(e)}")
-            else:
-                ErrorHandler.show_error("Please fill all required fields")
-
-else:  # Exchange
-    with st.sidebar.form("add_exchange"):
-        st.markdown("### Add Exchange")
-
-        exchange_name = st.text_input("Exchange Name", placeholder="My Binance Account")
-        exchange = st.selectbox(
-            "Exchange",
-            SupportedExchanges.get_exchange_list(),
-            format_func=lambda x: SupportedExchanges.get_exchange_info(x).get('name', x)
-        )
-
-        st.warning("🔒 API keys stored in session only (cleared when you close browser)")
-        st.caption("**Required permissions**: Read balances only")
-        st.caption("**Forbidden**: Withdrawals, trading, transfers")
-
-        api_key = st.text_input("API Key", type="password", help="Read-only API key")
-        api_secret = st.text_input("API Secret", type="password", help="API secret")
-
-        # Show docs link
-        exchange_info = SupportedExchanges.get_exchange_info(exchange)
-        if exchange_info.get('docs_url'):
-            st.caption(f"[How to create API keys]({exchange_info['docs_url']})")
-
-        if st.form_submit_button("Connect Exchange", type="primary"):
-            if exchange_name and api_key and api_secret:
-                try:
-                    with st.spinner(f"Connecting to {exchange}..."):
-                        account = st.session_state.account_manager.add_exchange_account(
-                            exchange_name, exchange, api_key, api_secret
-                        )
-                        st.session_state.account_manager.save_account_to_db(account)
-                        st.session_state.accounts.append(account)
-                        ErrorHandler.show_success(f"Connected to {exchange_name}")
-                        st.rerun()
-                except Exception as e:
-                    ErrorHandler.show_error("Failed to connect exchange", str(e))
-            else:
-                ErrorHandler.show_error("Please fill all required fields")
-
-# Main content area
-if st.session_state.accounts:
-    # Calculate portfolio total
-    total_value = 0.0
-    for account in st.session_state.accounts:
-        if account.get('data'):
-            try:
-                value = st.session_state.account_manager.calculate_account_value(account, base_currency)
-                total_value += value
-            except Exception as e:
-                st.error(f"Error calculating value for {account.get('name', 'Unknown')}: {str(e)}")
-                import traceback
-                st.code(traceback.format_exc())
-
-    # Portfolio overview
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.metric(
-            "💼 Total Portfolio",
-            format_currency(total_value, base_currency.upper()),
-            help="Total value across all accounts"
-        )
-
-    with col2:
-        wallet_count = len([a for a in st.session_state.accounts if a['type'] == 'wallet'])
-        st.metric("🏦 DeFi Wallets", wallet_count)
+@st.fragment
+def render_add_account():
+    """Add-account forms; switching account type reruns only this fragment"""
+    account_type = st.radio("Account Type", ["DeFi Wallet", "Exchange"], key="account_type")
+
+    if account_type == "DeFi Wallet":
+        with st.form("add_wallet"):
+            st.markdown("### Add DeFi Wallet")
+            wallet_name = st.text_input("Wallet Name", placeholder="My ETH Wallet")
+            blockchain = st.selectbox("Blockchain", ['ethereum', 'bitcoin'])
+            wallet_address = st.text_input(
+                "Wallet Address",
+                placeholder="0x... or bc1...",
+                help="Only public addresses - never enter private keys!"
+            )
+
+            if st.form_submit_button("Add Wallet", type="primary"):
+                if (wallet_name and wallet_address
+                        and wallet_account_id(blockchain, wallet_address) in st.session_state.accounts_by_id):
+                    ErrorHandler.show_error("Failed to add wallet", "This wallet is already being tracked")
+                elif wallet_name and wallet_address:
+                    try:
+                        with st.spinner("Adding wallet..."):
+                            wallet_data = fetch_wallet_data(st.session_state.account_manager, blockchain, wallet_address)
+                            account = st.session_state.account_manager.add_wallet_account(
+                                wallet_name, blockchain, wallet_address, wallet_data
+                            )
+                            st.session_state.account_manager.save_account_to_db(account)
+                            st.session_state.accounts_by_id[account['id']] = account
+                            ErrorHandler.show_success(f"Added {wallet_name}")
+                            st.rerun()
+                    except RetryError as e:
+                        # Unwrap the RetryError to get the actual error
+                        if e.last_attempt and e.last_attempt.exception():
+                            actual_error = str(e.last_attempt.exception())
+                            ErrorHandler.show_error("Failed to add wallet", actual_error)
+                        else:
+                            ErrorHandler.show_error("Failed to add wallet", "Connection failed after multiple retries")
+                    except ValueError as e:
+                        ErrorHandler.show_error("Failed to add wallet", str(e))
+                    except Exception as e:
+                        ErrorHandler.show_error("Failed to add wallet", f"Unexpected error: {str(e)}")
+                else:
+                    ErrorHandler.show_error("Please fill all required fields")
 
-    with col3:
-        exchange_count = len([a for a in st.session_state.accounts if a['type'] == 'exchange'])
-        st.metric("🏢 Exchanges", exchange_count)
+    else:  # Exchange
+        with st.form("add_exchange"):
+            st.markdown("### Add Exchange")
 
-    # Portfolio composition chart
-    if total_value > 0:
-        st.subheader("📊 Portfolio Composition")
+            exchange_name = st.text_input("Exchange Name", placeholder="My Binance Account")
+            exchange = st.selectbox(
+                "Exchange",
+                SupportedExchanges.get_exchange_list(),
+                format_func=SupportedExchanges.get_exchange_names().get
+            )
 
-        composition_data = []
-        for account in st.session_state.accounts:
-            if account.get('data'):
-                try:
-                    account_value = st.session_state.account_manager.calculate_account_value(account, base_currency)
-                    if account_value > 0:
-                        composition_data.append({
-                            'Account': account['name'],
-                            'Type': account['type'].title(),
-                            'Value': account_value,
-                            'Percentage': (account_value / total_value) * 100
-                        })
-                except:
-                    pass
-
-        if composition_data:
-            df_composition = pd.DataFrame(composition_data)
+            st.warning("🔒 API keys stored in session only (cleared when you close browser)")
+            st.caption("**Required permissions**: Read balances only")
+            st.caption("**Forbidden**: Withdrawals, trading, transfers")
 
-            col1, col2 = st.columns(2)
+            api_key = st.text_input("API Key", type="password", help="Read-only API key")
+            api_secret = st.text_input("API Secret", type="password", help="API secret")
 
-            with col1:
-                fig_pie = px.pie(
-                    df_composition,
-                    values='Value',
-                    names='Account',
-                    title=f"Portfolio Distribution ({base_currency.upper()})",
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
+            # Show docs link
+            exchange_info = SupportedExchanges.get_exchange_info(exchange)
+            if exchange_info.get('docs_url'):
+                st.caption(f"[How to create API keys]({exchange_info['docs_url']})")
 
-            with col2:
-                fig_bar = px.bar(
-                    df_composition,
-                    x='Account',
-                    y='Value',
-                    title=f"Account Values ({base_currency.upper()})",
-                    color='Type',
-                    text='Value'
-                )
-                fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-                st.plotly_chart(fig_bar, use_container_width=True)
+            if st.form_submit_button("Connect Exchange", type="primary"):
+                if exchange_name and api_key and api_secret:
+                    try:
+                        with st.spinner(f"Connecting to {exchange}..."):
+                            account = st.session_state.account_manager.add_exchange_account(
+                                exchange_name, exchange, api_key, api_secret
+                            )
+                            st.session_state.account_manager.save_account_to_db(account)
+                            st.session_state.accounts_by_id[account['id']] = account
+                            ErrorHandler.show_success(f"Connected to {exchange_name}")
+                            st.rerun()
+                    except Exception as e:
+                        ErrorHandler.show_error("Failed to connect exchange", str(e))
+                else:
+                    ErrorHandler.show_error("Please fill all required fields")
 
-    # Account details
-    st.subheader("💳 Account Details")
+with st.sidebar:
+    render_add_account()
 
-    for i, account in enumerate(st.session_state.accounts):
+@st.fragment
+def render_accounts(accounts: list, base_currency: str, prices: dict):
+    """Render account cards; widgets inside rerun only this fragment"""
+    for account in accounts:
         # Check if we have data
         if not account.get('data'):
             # Try to load from cached holdings
             if account.get('cached_holdings'):
                 st.info(f"ℹ️ {account['name']}: Using cached data. Click refresh to update.")
+            elif account['type'] == 'wallet':
+                # Prefetch before rendering failed for this wallet
+                st.warning(f"⚠️ {account['name']}: Unable to load data")
+                continue
             else:
-                if account['type'] == 'wallet':
-                    # Try to fetch wallet data
-                    try:
-                        with st.spinner(f"Loading {account['name']}..."):
-                            st.session_state.account_manager.refresh_account_data(account)
-                    except:
-                        st.warning(f"⚠️ {account['name']}: Unable to load data")
-                        continue
-                else:
-                    st.warning(f"⚠️ {account['name']}: Session expired. Please re-add exchange.")
-                    continue
+                st.warning(f"⚠️ {account['name']}: Session expired. Please re-add exchange.")
+                continue
 
         # Calculate account value
         account_total = 0.0
         try:
-            account_total = st.session_state.account_manager.calculate_account_value(account, base_currency)
+            account_total = st.session_state.account_manager.calculate_account_value(account, base_currency, prices)
         except:
             pass
 
@@ -338,64 +317,15 @@ if st.session_state.accounts:
             st.metric("Value", format_currency(account_total, base_currency.upper()))
 
         with col3:
-            if st.button(f"🗑️ Remove", key=f"remove_{i}"):
-                st.session_state.accounts.pop(i)
-                st.rerun()
+            if st.button(f"🗑️ Remove", key=f"remove_{account['id']}"):
+                st.session_state.accounts_by_id.pop(account['id'], None)
+                st.session_state.account_manager.delete_account(account)
+                st.rerun()  # Full rerun: totals and charts depend on the account list
 
         # Account assets
-        assets = []
-
-        if account['type'] == 'wallet' and account.get('data'):
-            if 'native' in account['data'] and account['data']['native']:
-                native = account['data']['native']
-                try:
-                    price = st.session_state.account_manager.price_client.get_price(native['symbol'], base_currency)
-                    value = native['balance'] * price if price else 0
-                except:
-                    price = 0
-                    value = 0
-
-                assets.append({
-                    'Symbol': native['symbol'],
-                    'Balance': format_balance(native['balance'], native['symbol']),
-                    'Type': 'Native',
-                    'Value': format_currency(value, base_currency.upper()) if value > 0 else 'N/A'
-                })
-
-            if 'tokens' in account['data']:
-                for token in account['data']['tokens']:
-                    try:
-                        price = st.session_state.account_manager.price_client.get_price(token['symbol'], base_currency)
-                        value = token['balance'] * price if price else 0
-                    except:
-                        price = 0
-                        value = 0
-
-                    assets.append({
-                        'Symbol': token['symbol'],
-                        'Balance': format_balance(token['balance'], token['symbol']),
-                        'Type': 'Token',
-                        'Value': format_currency(value, base_currency.upper()) if value > 0 else 'N/A'
-                    })
-
-        elif account['type'] == 'exchange' and account.get('data'):
-            for asset in account['data']:
-                try:
-                    price = st.session_state.account_manager.price_client.get_price(asset['symbol'], base_currency)
-                    value = asset['balance'] * price if price else 0
-                except:
-                    price = 0
-                    value = 0
-
-                assets.append({
-                    'Symbol': asset['symbol'],
-                    'Balance': format_balance(asset['balance'], asset['symbol']),
-                    'Type': 'Exchange',
-                    'Value': format_currency(value, base_currency.upper()) if value > 0 else 'N/A'
-                })
-
-        if assets:
-            df_assets = pd.DataFrame(assets)
+        df_assets = build_asset_table(account, prices, account['id'], account.get('last_updated'), base_currency,
+                                      st.session_state.account_manager.get_price_key(account, prices))
+        if not df_assets.empty:
             st.dataframe(df_assets, use_container_width=True, hide_index=True)
         else:
             st.info("No assets found")
@@ -405,31 +335,75 @@ if st.session_state.accounts:
 
         st.markdown("---")
 
+# Main content area
+if accounts:
+    # Fetch wallets with neither live nor cached data concurrently, before anything renders
+    missing = [a for a in wallets if not a.get('data') and not a.get('cached_holdings')]
+    if missing:
+        with st.spinner(f"Loading {len(missing)} wallet(s)..."):
+            st.session_state.account_manager.refresh_all(missing)
+
+    # Price every held symbol up front in one batch, shared across accounts
+    prices = st.session_state.account_manager.get_prices(accounts, base_currency)
+
+    # Value each account once; the total and the composition chart share the results
+    account_values = []
+    for account in accounts:
+        if account.get('data'):
+            try:
+                value = st.session_state.account_manager.calculate_account_value(account, base_currency, prices)
+                account_values.append((account, value))
+            except Exception as e:
+                # Full traceback goes to the server log, not the page
+                logger.exception("Value calculation failed for %s", account.get('name', 'Unknown'))
+                st.error(f"Error calculating value for {account.get('name', 'Unknown')}: {str(e)}")
+    total_value = sum(value for _, value in account_values)
+
+    # Portfolio overview
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric(
+            "💼 Total Portfolio",
+            format_currency(total_value, base_currency.upper()),
+            help="Total value across all accounts"
+        )
+
+    with col2:
+        st.metric("🏦 DeFi Wallets", len(wallets))
+
+    with col3:
+        st.metric("🏢 Exchanges", len(exchanges))
+
+    # Portfolio composition chart
+    if total_value > 0:
+        st.subheader("📊 Portfolio Composition")
+
+        composition = tuple(
+            (account['name'], account['type'].title(), value, (value / total_value) * 100)
+            for account, value in account_values
+            if value > 0
+        )
+
+        if composition:
+            fig_pie, fig_bar = build_portfolio_figures(composition, base_currency)
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.plotly_chart(fig_pie, use_container_width=True)
+
+            with col2:
+                st.plotly_chart(fig_bar, use_container_width=True)
+
+    # Account details
+    st.subheader("💳 Account Details")
+    render_accounts(accounts, base_currency, prices)
+
 else:
     # Empty state
-    st.markdown("""
-    <div style="text-align: center; padding: 50px;">
-        <h2>🚀 Welcome to Your Crypto Portfolio Tracker!</h2>
-        <p style="font-size: 1.1rem; color: #666;">
-            Get started by adding your first DeFi wallet or exchange account using the sidebar.
-        </p>
-        <p style="color: #999;">
-            📱 Connect wallets from Ethereum, Bitcoin<br>
-            🏢 Link exchanges like Coinbase, Binance, Kraken<br>
-            📊 View everything in your preferred currency<br>
-            🔒 Session-only security - keys never saved
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(WELCOME_HTML, unsafe_allow_html=True)
 
 # Footer
 st.markdown("---")
-st.markdown(
-    """
-    <div style="text-align: center; color: #666; padding: 20px;">
-        <p>🔒 <strong>Security:</strong> API keys stored in session memory only • Cleared on browser close</p>
-        <p>⚠️ <strong>Important:</strong> Never share your private keys or seed phrases</p>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
@@ -1,10 +1,18 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import hashlib
 import json
 import time
+import uuid
+
+# Shared formatter: memoized at module level, so its cache survives script reruns
+from utils.formatters import format_currency
 
 # Page configuration
 st.set_page_config(
@@ -14,46 +22,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 3rem;
-        font-weight: bold;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 20px;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin: 10px 0;
-    }
-    .wallet-card {
-        border: 1px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        background-color: #f9f9f9;
-    }
-    .exchange-card {
-        border: 1px solid #4CAF50;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        background-color: #f1f8e9;
-    }
-</style>
-""", unsafe_allow_html=True)
-
 # Initialize session state
+# Accounts are keyed by a stable id so removal doesn't depend on list positions
 if 'accounts' not in st.session_state:
-    st.session_state.accounts = []
+    st.session_state.accounts = {}
+    st.session_state.next_account_id = 1
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = datetime.now()
 
@@ -104,56 +77,107 @@ CONVERSION_RATES = {
     'ETH': {'ETH': 1, 'BTC': 18.75, 'SOL': 0.04, 'BNB': 0.13, 'ADA': 0.00019, 'MATIC': 0.00033, 'USDC': 0.00042, 'USDT': 0.00042, 'UNI': 0.0035, 'LINK': 0.0063}
 }
 
-def convert_price(amount, from_symbol, to_currency):
-    """Convert price from one currency to another"""
-    return amount * CONVERSION_RATES[to_currency].get(from_symbol, 0)
-
-def format_currency(value, currency):
-    """Format currency display"""
-    if currency == 'BTC':
-        return f"₿{value:.8f}"
-    elif currency == 'ETH':
-        return f"Ξ{value:.6f}"
-    elif currency == 'EUR':
-        return f"€{value:,.2f}"
-    else:
-        return f"${value:,.2f}"
+@st.cache_resource
+def rate_table():
+    """Symbol ids, currency ids and a (currency, symbol) rate matrix, built once per process"""
+    symbols = sorted({symbol for rates in CONVERSION_RATES.values() for symbol in rates})
+    symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+    currency_ids = {currency: i for i, currency in enumerate(CONVERSION_RATES)}
+
+    # The extra last column stays 0 and is the id given to unknown symbols
+    rates = np.zeros((len(currency_ids), len(symbols) + 1))
+    for currency, currency_id in currency_ids.items():
+        for symbol, rate in CONVERSION_RATES[currency].items():
+            rates[currency_id, symbol_ids[symbol]] = rate
+    return symbol_ids, currency_ids, rates
+
+# Column formats matching format_currency, for st.dataframe column_config
+CURRENCY_COLUMN_FORMATS = {'USD': 'dollar', 'EUR': 'euro', 'BTC': '₿%.8f', 'ETH': 'Ξ%.6f'}
 
+@st.cache_data(ttl=30, show_spinner=False)
 def fetch_wallet_data(address, chain):
     """Mock function to fetch wallet data - replace with real API calls"""
     time.sleep(1)  # Simulate API delay
     return MOCK_WALLET_DATA.get(chain, {'native': {'symbol': 'ETH', 'balance': 0, 'price': 0}, 'tokens': []})
 
-def fetch_exchange_data(exchange, api_key, api_secret):
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_exchange_cached(exchange, api_key_hash, _api_key, _api_secret):
     """Mock function to fetch exchange data - replace with real API calls"""
     time.sleep(1.5)  # Simulate API delay
     return MOCK_EXCHANGE_DATA.get(exchange, [])
 
-def calculate_account_total(account, base_currency):
-    """Calculate total value for an account"""
-    total = 0
-    if account['type'] == 'wallet':
-        if 'native' in account['data']:
-            total += convert_price(account['data']['native']['balance'], 
-                                 account['data']['native']['symbol'], base_currency)
-        if 'tokens' in account['data']:
-            for token in account['data']['tokens']:
-                total += convert_price(token['balance'], token['symbol'], base_currency)
-    elif account['type'] == 'exchange':
-        for asset in account['data']:
-            total += convert_price(asset['balance'], asset['symbol'], base_currency)
-    return total
-
-def calculate_total_portfolio(base_currency):
-    """Calculate total portfolio value"""
-    total = 0
-    for account in st.session_state.accounts:
-        total += calculate_account_total(account, base_currency)
-    return total
+def fetch_exchange_data(exchange, api_key, api_secret):
+    """Fetch exchange data, cached for 30s per exchange and API key (secrets are never cache keys)"""
+    api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    return _fetch_exchange_cached(exchange, api_key_hash, api_key, api_secret)
+
+def to_columns(data, account_type):
+    """Convert fetched assets into parallel arrays (one per field) for vectorized valuation"""
+    if account_type == 'wallet':
+        assets, types = [], []
+        if 'native' in data:
+            assets.append(data['native'])
+            types.append('Native')
+        for token in data.get('tokens', []):
+            assets.append(token)
+            types.append('Token')
+    else:
+        assets, types = data, ['Exchange'] * len(data)
+
+    symbol_ids = rate_table()[0]
+    return {
+        'symbols': np.array([asset['symbol'] for asset in assets], dtype=str),
+        'symbol_ids': np.array([symbol_ids.get(asset['symbol'], len(symbol_ids)) for asset in assets], dtype=np.intp),
+        'balances': np.array([asset['balance'] for asset in assets], dtype=np.float64),
+        'prices': np.array([asset['price'] for asset in assets], dtype=np.float64),
+        'types': np.array(types, dtype=str)
+    }
+
+def build_holdings_df(accounts, base_currency):
+    """Stack every account's asset columns into one DataFrame, valued in base_currency"""
+    columns = [account['data'] for account in accounts]
+    df = pd.DataFrame({
+        'account': np.repeat(np.arange(len(columns)), [len(c['symbols']) for c in columns]),
+        'symbol': np.concatenate([c['symbols'] for c in columns]),
+        'balance': np.concatenate([c['balances'] for c in columns]),
+        'price': np.concatenate([c['prices'] for c in columns]),
+        'type': np.concatenate([c['types'] for c in columns])
+    })
+    # One gather and multiply instead of converting each asset in a Python loop
+    _, currency_ids, rates = rate_table()
+    symbol_ids = np.concatenate([c['symbol_ids'] for c in columns])
+    df['value'] = df['balance'].to_numpy() * rates[currency_ids[base_currency]][symbol_ids]
+    return df
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def build_asset_table(account_id, data_version, base_currency, hide_small, _assets):
+    """Build an account's asset table; rebuilt only when its data, currency or filter changes"""
+    return pd.DataFrame({
+        'Symbol': _assets['symbol'],
+        'Balance': _assets['balance'],
+        'Price': _assets['price'],
+        'Value': _assets['value'],
+        'Type': _assets['type']
+    })
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def build_portfolio_figures(composition, base_currency):
+    """Build the pie (by account) and bar (by type) charts, shared across reruns with the same data"""
+    df_composition = pd.DataFrame(list(composition), columns=['Account', 'Type', 'Value'])
+
+    fig_pie = px.pie(df_composition, values='Value', names='Account',
+                   title=f"Portfolio Distribution ({base_currency})",
+                   color_discrete_sequence=px.colors.qualitative.Set3)
+
+    type_summary = df_composition.groupby('Type')['Value'].sum().reset_index()
+    fig_bar = px.bar(type_summary, x='Type', y='Value',
+                   title=f"Value by Account Type ({base_currency})",
+                   color='Type')
+    return fig_pie, fig_bar
 
 # Header
-st.markdown('<h1 class="main-header">💰 Crypto Portfolio Tracker</h1>', unsafe_allow_html=True)
-st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666;">Track your DeFi wallets and centralized exchange holdings</p>', unsafe_allow_html=True)
+st.title("💰 Crypto Portfolio Tracker")
+st.caption("Track your DeFi wallets and centralized exchange holdings")
 
 # Sidebar for controls
 st.sidebar.header("⚙️ Settings")
@@ -174,20 +198,37 @@ hide_small = st.sidebar.toggle("Hide Small Balances (<$1)", value=False)
 # Refresh button
 if st.sidebar.button("🔄 Refresh All", type="primary"):
     with st.spinner("Refreshing all accounts..."):
-        for i, account in enumerate(st.session_state.accounts):
-            if account['type'] == 'wallet':
-                account['data'] = fetch_wallet_data(account['address'], account['chain'])
-            else:
-                account['data'] = fetch_exchange_data(account['exchange'], 'api_key', 'api_secret')
-            account['last_updated'] = datetime.now()
+        # Fetches are I/O-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {}
+            for account in st.session_state.accounts.values():
+                if account['type'] == 'wallet':
+                    future = executor.submit(fetch_wallet_data, account['address'], account['chain'])
+                else:
+                    future = executor.submit(fetch_exchange_data, account['exchange'], 'api_key', 'api_secret')
+                futures[future] = account
+
+            for future in as_completed(futures):
+                account = futures[future]
+                account['data'] = to_columns(future.result(), account['type'])
+                account['data_version'] = uuid.uuid4().hex
+                account['last_updated'] = datetime.now()
     st.session_state.last_refresh = datetime.now()
     st.rerun()
 
-# Auto-refresh logic
-if auto_refresh:
-    time.sleep(30)
+# Auto-refresh logic: a timed fragment reruns the app, so no script thread sits
+# in a 30s sleep (which also kept the rest of the page from rendering)
+@st.fragment(run_every=30)
+def auto_refresh_timer():
+    """Trigger a full rerun on each timer tick after the first render"""
+    if st.session_state.pop('auto_refresh_armed', False):
+        return
     st.rerun()
 
+if auto_refresh:
+    st.session_state.auto_refresh_armed = True
+    auto_refresh_timer()
+
 # Add new account section
 st.sidebar.markdown("---")
 st.sidebar.header("➕ Add New Account")
@@ -204,17 +245,19 @@ with st.sidebar.form("add_account"):
         if st.form_submit_button("Add Wallet", type="primary"):
             if account_name and wallet_address:
                 with st.spinner("Adding wallet..."):
-                    wallet_data = fetch_wallet_data(wallet_address, chain)
+                    wallet_data = to_columns(fetch_wallet_data(wallet_address, chain), 'wallet')
                     new_account = {
-                        'id': len(st.session_state.accounts) + 1,
+                        'id': st.session_state.next_account_id,
                         'type': 'wallet',
                         'name': account_name,
                         'address': wallet_address,
                         'chain': chain,
                         'data': wallet_data,
+                        'data_version': uuid.uuid4().hex,
                         'last_updated': datetime.now()
                     }
-                    st.session_state.accounts.append(new_account)
+                    st.session_state.accounts[new_account['id']] = new_account
+                    st.session_state.next_account_id += 1
                     st.success("Wallet added successfully!")
                     st.rerun()
             else:
@@ -230,27 +273,44 @@ with st.sidebar.form("add_account"):
         if st.form_submit_button("Add Exchange", type="primary"):
             if account_name and api_key and api_secret:
                 with st.spinner("Connecting to exchange..."):
-                    exchange_data = fetch_exchange_data(exchange, api_key, api_secret)
+                    exchange_data = to_columns(fetch_exchange_data(exchange, api_key, api_secret), 'exchange')
                     new_account = {
-                        'id': len(st.session_state.accounts) + 1,
+                        'id': st.session_state.next_account_id,
                         'type': 'exchange',
                         'name': account_name,
                         'exchange': exchange,
                         'data': exchange_data,
+                        'data_version': uuid.uuid4().hex,
                         'credentials': f"{api_key[:6]}...{api_key[-4:]}",
                         'last_updated': datetime.now()
                     }
-                    st.session_state.accounts.append(new_account)
+                    st.session_state.accounts[new_account['id']] = new_account
+                    st.session_state.next_account_id += 1
                     st.success("Exchange connected successfully!")
                     st.rerun()
             else:
                 st.error("Please fill all required fields")
 
 # Main content area
-if st.session_state.accounts:
+accounts = list(st.session_state.accounts.values())
+if accounts:
+    # Value every asset once; totals, chart data and asset tables all read from this
+    holdings = build_holdings_df(accounts, base_currency)
+    account_totals = holdings.groupby('account')['value'].sum().reindex(
+        range(len(accounts)), fill_value=0
+    )
+    # Hide small balances with one mask over all holdings (native balances are always listed)
+    visible = holdings[(holdings['value'] >= 1) | (holdings['type'] == 'Native')] if hide_small else holdings
+    assets_by_account = dict(tuple(visible.groupby('account')))
+
+    # Price/Value stay numeric (and sortable); the browser formats them per column
+    money_format = st.column_config.NumberColumn(format=CURRENCY_COLUMN_FORMATS[base_currency])
+    money_columns = {'Price': money_format, 'Value': money_format}
+
     # Portfolio overview
-    total_value = calculate_total_portfolio(base_currency)
+    total_value = float(account_totals.sum())
     
+    type_counts = Counter(a['type'] for a in accounts)
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -261,54 +321,38 @@ if st.session_state.accounts:
         )
     
     with col2:
-        wallet_count = len([a for a in st.session_state.accounts if a['type'] == 'wallet'])
-        st.metric("🏦 DeFi Wallets", wallet_count)
+        st.metric("🏦 DeFi Wallets", type_counts['wallet'])
     
     with col3:
-        exchange_count = len([a for a in st.session_state.accounts if a['type'] == 'exchange'])
-        st.metric("🏢 Exchanges", exchange_count)
+        st.metric("🏢 Exchanges", type_counts['exchange'])
     
     # Portfolio composition chart
     if total_value > 0:
         st.subheader("📊 Portfolio Composition")
         
-        # Prepare data for charts
-        composition_data = []
-        for account in st.session_state.accounts:
-            account_value = calculate_account_total(account, base_currency)
-            if not hide_small or account_value >= 1:
-                composition_data.append({
-                    'Account': account['name'],
-                    'Type': account['type'].title(),
-                    'Value': account_value,
-                    'Percentage': (account_value / total_value) * 100
-                })
+        # Prepare data for charts (hashable, so the figures can be cached on it)
+        composition = tuple(
+            (account['name'], account['type'].title(), float(account_value))
+            for account, account_value in zip(accounts, account_totals)
+            if not hide_small or account_value >= 1
+        )
         
-        if composition_data:
-            df_composition = pd.DataFrame(composition_data)
+        if composition:
+            fig_pie, fig_bar = build_portfolio_figures(composition, base_currency)
             
             col1, col2 = st.columns(2)
             
             with col1:
-                # Pie chart by account
-                fig_pie = px.pie(df_composition, values='Value', names='Account', 
-                               title=f"Portfolio Distribution ({base_currency})",
-                               color_discrete_sequence=px.colors.qualitative.Set3)
                 st.plotly_chart(fig_pie, use_container_width=True)
             
             with col2:
-                # Bar chart by type
-                type_summary = df_composition.groupby('Type')['Value'].sum().reset_index()
-                fig_bar = px.bar(type_summary, x='Type', y='Value',
-                               title=f"Value by Account Type ({base_currency})",
-                               color='Type')
                 st.plotly_chart(fig_bar, use_container_width=True)
     
     # Account details
     st.subheader("💳 Account Details")
     
-    for i, account in enumerate(st.session_state.accounts):
-        account_total = calculate_account_total(account, base_currency)
+    for i, account in enumerate(accounts):
+        account_total = account_totals[i]
         
         if hide_small and account_total < 1:
             continue
@@ -328,51 +372,17 @@ if st.session_state.accounts:
             st.metric("Value", format_currency(account_total, base_currency))
         
         with col3:
-            if st.button(f"🗑️ Remove", key=f"remove_{i}"):
-                st.session_state.accounts.pop(i)
+            if st.button(f"🗑️ Remove", key=f"remove_{account['id']}"):
+                del st.session_state.accounts[account['id']]
                 st.rerun()
         
         # Account assets
-        if account['type'] == 'wallet':
-            assets = []
-            if 'native' in account['data']:
-                native = account['data']['native']
-                assets.append({
-                    'Symbol': native['symbol'],
-                    'Balance': native['balance'],
-                    'Price': format_currency(native['price'], base_currency),
-                    'Value': format_currency(convert_price(native['balance'], native['symbol'], base_currency), base_currency),
-                    'Type': 'Native'
-                })
-            
-            if 'tokens' in account['data']:
-                for token in account['data']['tokens']:
-                    value = convert_price(token['balance'], token['symbol'], base_currency)
-                    if not hide_small or value >= 1:
-                        assets.append({
-                            'Symbol': token['symbol'],
-                            'Balance': token['balance'],
-                            'Price': format_currency(token['price'], base_currency),
-                            'Value': format_currency(value, base_currency),
-                            'Type': 'Token'
-                        })
-        
-        else:  # Exchange
-            assets = []
-            for asset in account['data']:
-                value = convert_price(asset['balance'], asset['symbol'], base_currency)
-                if not hide_small or value >= 1:
-                    assets.append({
-                        'Symbol': asset['symbol'],
-                        'Balance': asset['balance'],
-                        'Price': format_currency(asset['price'], base_currency),
-                        'Value': format_currency(value, base_currency),
-                        'Type': 'Exchange'
-                    })
-        
-        if assets:
-            df_assets = pd.DataFrame(assets)
-            st.dataframe(df_assets, use_container_width=True, hide_index=True)
+        df_assets = build_asset_table(
+            account['id'], account['data_version'], base_currency, hide_small,
+            assets_by_account.get(i, holdings.iloc[:0])
+        )
+        if not df_assets.empty:
+            st.dataframe(df_assets, use_container_width=True, hide_index=True, column_config=money_columns)
         else:
             st.info("No assets found or all assets below threshold")
         